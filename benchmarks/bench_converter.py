@@ -0,0 +1,300 @@
+"""
+Benchmark the ktdash converter stage by stage.
+
+Uses the bundled html/ktdash_*.html pages as fixtures, plus synthetic
+scale-ups of them (operatives and weapons multiplied), and checks every
+fixture against its golden html/<KILLTEAMID>.html so a speedup that changes
+the output is caught.
+
+    python benchmarks/bench_converter.py --repeat 20 --json bench.json
+"""
+import argparse
+import copy
+import html
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from ktdash_converter import compare, config, extract, inputs, plans, render, sinks, text  # noqa: E402
+
+
+def timed(fn, repeat, setup=None):
+    """Run fn(setup()) `repeat` times; setup runs outside the timer. Returns (stats, last result)."""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        result = fn(arg) if setup else fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"min_ms": min(samples), "median_ms": statistics.median(samples), "runs": repeat}, result
+
+
+def all_operatives(data):
+    return data.get("fireteams_operatives") or []
+
+
+def all_weapons(data):
+    return [weapon for op in all_operatives(data) for weapon in op.get("weapons") or []]
+
+
+def bench_render(data, repeat):
+    """Time each render function over the roster, the way render_document uses it."""
+    stages = {}
+    operatives = all_operatives(data)
+    weapons = all_weapons(data)
+
+    stages["render_document"], _ = timed(lambda: render.render_document(data), repeat)
+    stages["render_operatives"], _ = timed(lambda: render.render_operatives(operatives), repeat)
+    stages["render_stats_table"], _ = timed(lambda: [render.render_stats_table(op) for op in operatives], repeat)
+    stages["render_weapon_block"], _ = timed(
+        lambda: [render.render_weapon_block(op.get("weapons", [])) for op in operatives], repeat)
+    stages["render_profiles_table"], _ = timed(
+        lambda: [render.render_profiles_table(w.get("profiles")) for w in weapons], repeat)
+    stages["render_keywords"], _ = timed(
+        lambda: [text.render_keywords(op.get("keywords")) for op in operatives], repeat)
+
+    def render_sections():
+        for key in config.RENDER_ORDER:
+            value = data.get(key)
+            if isinstance(value, list) and value and key != "fireteams_operatives":
+                render.render_table(key, value)
+            elif isinstance(value, dict):
+                for subkey, subval in value.items():
+                    if isinstance(subval, list):
+                        render.render_table(subkey, subval)
+            elif isinstance(value, str):
+                render.render_value(key, value)
+    stages["render_table"], _ = timed(render_sections, repeat)
+    return stages
+
+
+def bench_pipeline(raw, repeat, scale=1):
+    """Time every stage from the raw attribute bytes to the written page."""
+    stages = {}
+    stages["html.unescape"], decoded = timed(lambda: html.unescape(raw.decode("utf-8")), repeat)
+    stages["json.loads"], parsed = timed(lambda: json.loads(decoded), repeat)
+    if scale > 1:
+        parsed = scale_roster(parsed, scale)
+    stages["remove_keys"], cleaned = timed(
+        lambda d: extract.remove_keys(d, config.INPUT_KEYS_TO_IGNORE), repeat, lambda: copy.deepcopy(parsed))
+    stages["flatten_all"], flattened = timed(
+        lambda d: extract.flatten_all(d, config.INPUT_FLATTEN_TARGETS), repeat, lambda: copy.deepcopy(cleaned))
+    stages["classify_strings"], data = timed(text.classify_strings, repeat, lambda: copy.deepcopy(flattened))
+    stages.update(bench_render(data, repeat))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        target = os.path.join(tmp, "out.html")
+
+        def write():
+            with sinks.open_sink(target) as sink:
+                render.render_document(data, sink)
+        stages["write"], _ = timed(write, repeat)
+
+    stats = {
+        "operatives": len(all_operatives(data)),
+        "weapons": len(all_weapons(data)),
+        "output_bytes": len(render.render_document(data).encode("utf-8")),
+    }
+    return stages, stats, data
+
+
+def scale_roster(data, factor):
+    """Synthetic roster with `factor` times the operatives (and so weapons), all uniquely named."""
+    data = copy.deepcopy(data)
+    for fireteam in data.get("fireteams") or []:
+        originals = fireteam.get("operatives") or []
+        scaled = []
+        for i in range(factor):
+            for op in originals:
+                clone = copy.deepcopy(op)
+                clone["opname"] = f"{op.get('opname', 'Operative')} #{i + 1}"
+                for weapon in clone.get("weapons") or []:
+                    weapon["wepname"] = f"{weapon.get('wepname', 'Weapon')} #{i + 1}"
+                scaled.append(clone)
+        fireteam["operatives"] = scaled
+    return data
+
+
+def library_memory(fixtures):
+    """Memory held by every fixture loaded at once, as plain dicts and with the compact loader."""
+    results = {}
+    for compact in (False, True):
+        loader = extract.CompactLoader() if compact else False
+        tracemalloc.start()
+        library = [extract.clean_and_flatten(fixture, compact=loader) for fixture in fixtures]
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del library, loader
+        results["compact" if compact else "dict"] = {"current_kib": current / 1024, "peak_kib": peak / 1024}
+    return results
+
+
+def bench_compare(fixtures, repeat, copies=100):
+    """--compare over the library loaded `copies` times: filling the profile store and each aggregate pass."""
+    rosters = [extract.clean_and_flatten(fixture) for fixture in fixtures] * copies
+
+    def fill():
+        store = compare.ProfileStore()
+        for data in rosters:
+            store.add_roster(data)
+        return store
+    stages = {}
+    stages["fill_store"], store = timed(fill, repeat)
+    stages["expected_damage"], expected = timed(store.expected_damage, repeat)
+    stages["team_averages"], _ = timed(lambda: store.team_averages(expected), repeat)
+    stages["hit_distribution"], _ = timed(store.hit_distribution, repeat)
+    stages["ranked"], _ = timed(lambda: store.ranked(expected, config.COMPARE_TOP_WEAPONS), repeat)
+    stages["render_comparison"], _ = timed(lambda: compare.render_comparison(store, sinks.PartList()), repeat)
+    return stages, len(store)
+
+
+def startup_times(fixture, repeat):
+    """Wall time of fresh interpreters: bare, importing the package, and converting one page."""
+    commands = {
+        "python": [sys.executable, "-c", "pass"],
+        "import ktdash_converter": [sys.executable, "-c", "import ktdash_converter"],
+        "convert one page": None,
+    }
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        commands["convert one page"] = [sys.executable, "-m", "ktdash_converter", fixture,
+                                        "--output-dir", tmp, "--no-cache"]
+        for label, command in commands.items():
+            results[label], _ = timed(
+                lambda: subprocess.run(command, cwd=REPO_ROOT, check=True, stdout=subprocess.DEVNULL), repeat)
+    return results
+
+
+def check_golden(fixture, data):
+    """Compare the rendered page with the checked-in html/<KILLTEAMID>.html (line endings normalized)."""
+    golden_path = REPO_ROOT / render.output_path_for(data)
+    if not golden_path.exists():
+        return "missing"
+    golden = golden_path.read_bytes().decode("utf-8").replace("\r\n", "\n")
+    buffer = io.StringIO()
+    with sinks.open_sink(buffer) as sink:
+        render.render_document(data, sink)
+    return "ok" if buffer.getvalue() == golden else "mismatch"
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(title, stages):
+    print(f"\n{title}")
+    for stage, result in stages.items():
+        print(f"  {stage:<24} {result['median_ms']:9.3f} ms  (min {result['min_ms']:.3f})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixtures", nargs="*", help="ktdash pages (default: html/ktdash_*)")
+    parser.add_argument("--repeat", type=int, default=10, help="runs per stage (default: 10)")
+    parser.add_argument("--scales", type=int, nargs="*", default=[10, 100],
+                        help="synthetic scale-up factors (default: 10 100)")
+    parser.add_argument("--scale-fixture", default=None, help="fixture to scale up (default: the first)")
+    parser.add_argument("--fragment-cache", action="store_true",
+                        help="keep the fragment cache on (off by default so every run renders)")
+    parser.add_argument("--no-escape-cache", action="store_true",
+                        help="escape every cell afresh (to measure what the escape cache saves)")
+    parser.add_argument("--json", dest="json_path", help="write machine-readable results here")
+    args = parser.parse_args(argv)
+
+    os.chdir(REPO_ROOT)
+    fixtures = args.fixtures or inputs.find_input_files(config.BASE_INPUT_PATH_HTML)
+    if not args.fragment_cache:
+        render.FRAGMENT_CACHE = render.FragmentCache(0)
+    if args.no_escape_cache:
+        text.ESCAPE_CACHE = text.EscapeCache(0)
+    plans.get_render_plans()
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "fragment_cache": args.fragment_cache,
+            "escape_cache": not args.no_escape_cache,
+        },
+        "fixtures": {},
+        "scaled": {},
+        "golden": {},
+        "library_memory": {},
+        "startup": {},
+        "escape_cache": {},
+        "compare": {},
+    }
+
+    for fixture in fixtures:
+        name = Path(fixture).name
+        extract_stage, raw = timed(lambda: extract.read_killteam_attribute(fixture), args.repeat)
+        stages, stats, data = bench_pipeline(raw, args.repeat)
+        stages = {"extract_attribute": extract_stage, **stages}
+        results["fixtures"][name] = {"stages": stages, **stats}
+        results["golden"][name] = check_golden(name, data)
+        print_table(f"{name}: {stats['operatives']} operatives, {stats['weapons']} weapons, "
+                    f"golden {results['golden'][name]}", stages)
+
+    if fixtures and args.scales:
+        base = args.scale_fixture or fixtures[0]
+        raw = extract.read_killteam_attribute(base)
+        for factor in args.scales:
+            stages, stats, _ = bench_pipeline(raw, max(1, args.repeat // factor), scale=factor)
+            label = f"{Path(base).name} x{factor}"
+            results["scaled"][label] = {"factor": factor, "stages": stages, **stats}
+            print_table(f"{label}: {stats['operatives']} operatives, {stats['weapons']} weapons", stages)
+
+    results["escape_cache"] = text.ESCAPE_CACHE.stats()
+    escape_stats = results["escape_cache"]
+    print(f"\nEscape cache: {escape_stats['hits']} hits, {escape_stats['misses']} misses "
+          f"({100 * escape_stats['hit_rate']:.0f}%), {escape_stats['int_fast_path']} ints, {escape_stats['entries']} entries")
+
+    if fixtures:
+        results["library_memory"] = library_memory(fixtures)
+        print(f"\nAll {len(fixtures)} fixtures loaded at once")
+        for loader, memory in results["library_memory"].items():
+            print(f"  {loader:<24} {memory['current_kib']:9.1f} KiB  (peak {memory['peak_kib']:.1f})")
+
+    if fixtures:
+        stages, profiles = bench_compare(fixtures, args.repeat)
+        results["compare"] = {"profiles": profiles, "stages": stages}
+        print_table(f"--compare over the library x100 ({profiles} weapon profiles)", stages)
+
+    if fixtures:
+        results["startup"] = startup_times(fixtures[0], args.repeat)
+        print_table(f"Startup ({Path(fixtures[0]).name})", results["startup"])
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=4), encoding="utf-8")
+        print(f"\n📈 Results written to {args.json_path}")
+
+    mismatches = [name for name, status in results["golden"].items() if status != "ok"]
+    if mismatches:
+        print(f"\n❌ Output differs from the golden pages for: {', '.join(mismatches)}")
+        return 1
+    print("\n✅ All fixtures match their golden pages")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
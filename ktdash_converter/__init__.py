@@ -0,0 +1,42 @@
+"""
+Convert ktdash.app roster pages into standalone HTML overviews.
+
+Importing the package does no work: the names below are loaded from their
+modules on first access.
+
+    from ktdash_converter import clean_and_flatten, render_document
+    html = render_document(clean_and_flatten("html/ktdash_gk.html"))
+"""
+
+from importlib import import_module
+
+_EXPORTS = {
+    "BuildOptions": "options",
+    "apply_overrides": "options",
+    "ConfigError": "config",
+    "ConversionError": "extract",
+    "clean_and_flatten": "extract",
+    "convert_broken_json_from_file": "extract",
+    "flatten_all": "extract",
+    "render_document": "render",
+    "output_path_for": "render",
+    "do_work": "batch",
+    "convert_file": "batch",
+    "find_input_files": "inputs",
+    "run_batch": "batch",
+    "export_ndjson": "export",
+    "main": "cli",
+}
+
+__all__ = sorted(_EXPORTS)
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,7 @@
+"""python -m ktdash_converter [inputs...] [--output-dir DIR] [--set NAME=VALUE]"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,153 @@
+"""Bulk exports: converting ktdash_* pages straight out of zip/tar archives, optionally into one."""
+
+import io
+import os
+import posixpath
+import tarfile
+import time
+import zipfile
+from contextlib import contextmanager, nullcontext
+from dataclasses import replace
+
+from . import config
+from .extract import ConversionError, clean_and_flatten_stream
+from .inputs import archive_kind
+from .options import BuildOptions
+from .sinks import open_sink, update_gzip_companion
+from .stylesheet import prepare_stylesheet, stylesheet_filename, stylesheet_text
+
+# === ARCHIVES ===
+
+def is_roster_member(name):
+    return posixpath.basename(name).startswith("ktdash_")
+
+def iter_archive_pages(archive_path):
+    """
+    Yield (member name, binary stream) for every ktdash_* member, in archive
+    order and without extracting anything. Tar archives are read as a single
+    forward stream, so each stream is only valid until the next one is yielded.
+    """
+    try:
+        if archive_kind(archive_path) == "zip":
+            with zipfile.ZipFile(archive_path) as zf:
+                for info in zf.infolist():
+                    if not info.is_dir() and is_roster_member(info.filename):
+                        with zf.open(info) as stream:
+                            yield info.filename, stream
+        else:
+            with tarfile.open(archive_path, mode="r|*") as tf:
+                for member in tf:
+                    if member.isfile() and is_roster_member(member.name):
+                        yield member.name, tf.extractfile(member)
+    except (OSError, zipfile.BadZipFile, tarfile.TarError, EOFError) as e:
+        raise ConversionError(f"Cannot read archive: {e}")
+
+def iter_pages(paths):
+    """(label, name, binary stream) for plain pages and for the ktdash_* members of archives."""
+    for path in paths:
+        if archive_kind(path) is None:
+            with open(path, "rb") as stream:
+                yield path, path, stream
+        else:
+            for name, stream in iter_archive_pages(path):
+                yield f"{path}:{name}", name, stream
+
+
+class OutputArchive:
+    """
+    Zip or tar archive the converted pages are written into. Zip members are
+    streamed; a tar member needs its size up front, so one page is buffered.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.names = set()
+        if archive_kind(path) == "zip":
+            self.archive = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+        elif archive_kind(path) == "tar":
+            mode = next(mode for suffix, mode in config.TAR_SUFFIXES.items() if path.lower().endswith(suffix))
+            self.archive = tarfile.open(path, mode)
+        else:
+            raise ValueError(f"{path} is not a .zip or .tar archive name")
+
+    @contextmanager
+    def open_member(self, name):
+        """Text stream for one member; names must be unique."""
+        if name in self.names:
+            raise ConversionError(f"{name} was already written to {self.path}")
+        self.names.add(name)
+        if isinstance(self.archive, zipfile.ZipFile):
+            info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with self.archive.open(info, "w") as raw, io.TextIOWrapper(raw, encoding="utf-8", newline="") as text:
+                yield text
+        else:
+            buffer = io.BytesIO()
+            text = io.TextIOWrapper(buffer, encoding="utf-8", newline="")
+            yield text
+            text.flush()
+            info = tarfile.TarInfo(name)
+            info.size = buffer.tell()
+            info.mtime = int(time.time())
+            buffer.seek(0)
+            self.archive.addfile(info, buffer)
+
+    def write_text(self, name, text):
+        with self.open_member(name) as f:
+            f.write(text)
+
+    def close(self):
+        self.archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def convert_archives(paths, options=None, output_archive=None):
+    """
+    Convert plain pages and the ktdash_* members of archives, one at a time.
+    Pages go to BASE_OUTPUT_PATH_HTML, or all into `output_archive`.
+    """
+    from .batch import print_batch_summary  # Imported here: iter_pages users (--ndjson, --compare) never render
+    options = options or BuildOptions()
+    results = []
+    with OutputArchive(output_archive) if output_archive else nullcontext() as archive:
+        if archive is None:
+            os.makedirs(config.BASE_OUTPUT_PATH_HTML, exist_ok=True)
+            options = prepare_stylesheet(options)
+        elif options.css == "external":
+            options = replace(options, stylesheet_href=stylesheet_filename(options.minify))
+            archive.write_text(options.stylesheet_href, stylesheet_text(options.minify))
+
+        for path in paths:
+            try:
+                for label, name, stream in iter_pages([path]):
+                    results.append(convert_page(label, name, stream, options, archive))
+            except (ConversionError, OSError) as e:
+                results.append({"input": path, "output": None, "error": str(e), "cached": False})
+
+    print_batch_summary(results)
+    return results
+
+def convert_page(label, name, stream, options, archive=None):
+    from .render import output_path_for, render_document  # Imported here, see convert_archives
+    result = {"input": label, "output": None, "error": None, "cached": False}
+    try:
+        data = clean_and_flatten_stream(stream, name, debug=options.debug, compact=options.compact)
+        output_file_html = output_path_for(data)
+        if archive is None:
+            with open_sink(output_file_html) as sink:
+                render_document(data, sink, options)
+            update_gzip_companion(output_file_html, options.gzip)
+            result["output"] = output_file_html
+        else:
+            member = os.path.basename(output_file_html)
+            with archive.open_member(member) as f, open_sink(f) as sink:
+                render_document(data, sink, options)
+            result["output"] = f"{archive.path}:{member}"
+    except ConversionError as e:
+        result["error"] = str(e)
+    return result
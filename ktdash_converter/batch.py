@@ -0,0 +1,201 @@
+"""Converting pages: one file, a batch across worker processes, or a stream to stdout."""
+
+import json
+import os
+import sys
+import time
+from dataclasses import replace
+
+from . import config
+from . import profiler
+from . import render
+from . import text
+from .extract import ConversionError, clean_and_flatten, clean_and_flatten_stream
+from .manifest import cache_status, config_fingerprint, file_sha256, load_manifest, save_manifest
+from .options import BuildOptions, apply_overrides
+from .profiler import aggregate_profiles, profile_report_path, profiling
+from .render import output_path_for, render_document
+from .sinks import open_sink, update_gzip_companion, write_gzip_companion
+from .stylesheet import prepare_stylesheet
+
+def do_work(input, options=None):
+    options = options or BuildOptions()
+
+    # Handle load of ktdash file
+    with profiler.PROFILER.stage("load"):
+        data = clean_and_flatten(input, debug=options.debug, compact=options.compact)
+
+    # Handle html-ification of JSON, streamed straight into the output file
+    output_file_html = output_path_for(data)
+    with profiler.PROFILER.stage("render"), open_sink(output_file_html) as sink:
+        render_document(data, sink, options)
+    if options.gzip:
+        with profiler.PROFILER.stage("gzip"):
+            update_gzip_companion(output_file_html, options.gzip)
+    else:
+        update_gzip_companion(output_file_html)  # Drops a companion an earlier --gzip run left behind
+    print(f"✅ HTML viewer created: {output_file_html} (clean, consistent, and ordered)")
+    return output_file_html
+
+# === BATCH ===
+
+def convert_file(file_path, options=None):
+    """
+    Batch worker: convert one page and report the outcome as a dict instead of
+    raising, so one bad roster never takes the rest of the batch down.
+    """
+    result = {"input": file_path, "output": None, "error": None, "cached": False}
+    options = options or BuildOptions()
+    apply_overrides(options.overrides)  # No-op unless this is a fresh (spawned) worker process
+    hits, misses = render.FRAGMENT_CACHE.hits, render.FRAGMENT_CACHE.misses
+    escape_hits, escape_misses = text.ESCAPE_CACHE.hits, text.ESCAPE_CACHE.misses
+    with profiling(options.profile) as file_profiler:
+        start = time.perf_counter()
+        try:
+            result["output"] = do_work(file_path, options)
+        except ConversionError as e:
+            result["error"] = str(e)
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+        total_ms = (time.perf_counter() - start) * 1000
+    result["fragments"] = {"hits": render.FRAGMENT_CACHE.hits - hits, "misses": render.FRAGMENT_CACHE.misses - misses}
+    result["escapes"] = {"hits": text.ESCAPE_CACHE.hits - escape_hits, "misses": text.ESCAPE_CACHE.misses - escape_misses}
+
+    if file_profiler is not None:
+        report = {"input": file_path, "output": result["output"], "error": result["error"],
+                  "total_ms": total_ms, **file_profiler.report()}
+        os.makedirs(options.profile_dir, exist_ok=True)
+        with open(profile_report_path(options.profile_dir, file_path), "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+        result["profile"] = report
+    return result
+
+def run_batch(file_paths, jobs=1, options=None, manifest_path=None, force=False):
+    """
+    Convert all files, fanning out over `jobs` worker processes. Results keep input order.
+    Pages whose input and configuration are unchanged since the last build recorded in
+    `manifest_path` (default: BUILD_MANIFEST; False for none) are skipped.
+    """
+    manifest_path = config.BUILD_MANIFEST if manifest_path is None else manifest_path
+    batch_start = time.perf_counter()
+    os.makedirs(config.BASE_OUTPUT_PATH_HTML, exist_ok=True)
+    options = prepare_stylesheet(options or BuildOptions())
+    results = {}
+    pending = list(file_paths)
+    input_hashes = {}
+    rebuild_reasons = {}
+    manifest = {}
+
+    if manifest_path:
+        manifest = load_manifest(manifest_path)
+        config_sha256 = config_fingerprint(options)
+        pending = []
+        for file_path in file_paths:
+            try:
+                input_hashes[file_path] = file_sha256(file_path)
+            except OSError:
+                pending.append(file_path)  # let the worker report it
+                continue
+            entry = manifest.get(file_path)
+            reason = "forced" if force else cache_status(entry, input_hashes[file_path], config_sha256)
+            if reason is None:
+                results[file_path] = {"input": file_path, "output": entry["output"], "error": None, "cached": True}
+                if options.gzip and os.path.exists(entry["output"]):
+                    write_gzip_companion(entry["output"], options.gzip)  # --gzip on an otherwise unchanged build
+            else:
+                pending.append(file_path)
+                rebuild_reasons[file_path] = reason
+
+    if jobs > 1 and len(pending) > 1:
+        from concurrent.futures import ProcessPoolExecutor  # Imported here: costly, and single-file runs never need it
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            converted = list(executor.map(convert_file, pending, [options] * len(pending)))
+    else:
+        converted = [convert_file(file_path, options) for file_path in pending]
+
+    for result in converted:
+        file_path = result["input"]
+        results[file_path] = result
+        if file_path not in input_hashes:
+            continue
+        result["rebuild_reason"] = rebuild_reasons[file_path]
+        if result["error"] is None:
+            manifest[file_path] = {
+                "input_sha256": input_hashes[file_path],
+                "config_sha256": config_sha256,
+                "output": result["output"],
+            }
+        else:
+            manifest.pop(file_path, None)
+
+    if manifest_path:
+        save_manifest(manifest_path, manifest)
+
+    if options.profile:
+        write_batch_profile(options.profile_dir, [r["profile"] for r in converted if "profile" in r],
+                            (time.perf_counter() - batch_start) * 1000)
+
+    results = [results[file_path] for file_path in file_paths]
+    print_batch_summary(results, show_cache=bool(manifest_path))
+    return results
+
+def write_batch_profile(profile_dir, reports, batch_ms):
+    aggregate = {"batch_ms": batch_ms, **aggregate_profiles(reports)}
+    os.makedirs(profile_dir, exist_ok=True)
+    path = os.path.join(profile_dir, "batch.profile.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(aggregate, f, indent=4)
+    print(f"⏱️ Profile reports written to {profile_dir} (batch aggregate: {path})")
+
+def print_batch_summary(results, show_cache=False):
+    failed = [r for r in results if r["error"] is not None]
+    print(f"\n=== Batch summary: {len(results) - len(failed)} converted, {len(failed)} failed ===")
+    if show_cache:
+        hits = sum(1 for r in results if r["cached"])
+        print(f"🗃️ Build cache: {hits} hits, {len(results) - hits} misses")
+    fragment_hits = sum(r.get("fragments", {}).get("hits", 0) for r in results)
+    fragment_misses = sum(r.get("fragments", {}).get("misses", 0) for r in results)
+    if fragment_hits or fragment_misses:
+        reuse = 100 * fragment_hits / (fragment_hits + fragment_misses)
+        print(f"🧩 Fragment cache: {fragment_hits} hits, {fragment_misses} misses ({reuse:.0f}% reused)")
+    escape_hits = sum(r.get("escapes", {}).get("hits", 0) for r in results)
+    escape_misses = sum(r.get("escapes", {}).get("misses", 0) for r in results)
+    if escape_hits or escape_misses:
+        reuse = 100 * escape_hits / (escape_hits + escape_misses)
+        print(f"🔤 Escape cache: {escape_hits} hits, {escape_misses} misses ({reuse:.0f}% reused)")
+    for result in results:
+        if result["error"] is not None:
+            print(f"❌ {result['input']}: {result['error']}")
+        elif result["cached"]:
+            print(f"⏭️ {result['input']} -> {result['output']} (unchanged)")
+        elif result.get("rebuild_reason"):
+            print(f"✅ {result['input']} -> {result['output']} ({result['rebuild_reason']})")
+        else:
+            print(f"✅ {result['input']} -> {result['output']}")
+
+def write_to_stdout(file_paths, options=None):
+    """
+    Stream each page (plain or in zip/tar exports) to stdout; status goes to
+    stderr so the output stays clean HTML.
+    """
+    from .archive import iter_pages  # Imported here: archive imports this module to convert exports
+    options = options or BuildOptions()
+    if options.css != "inline":
+        print("⚠️ --stdout always inlines the stylesheet", file=sys.stderr)
+        options = replace(options, css="inline", stylesheet_href=None)
+    failed = 0
+    with open_sink("-") as sink:
+        for file_path in file_paths:
+            try:
+                for label, name, stream in iter_pages([file_path]):
+                    try:
+                        data = clean_and_flatten_stream(stream, name, debug=options.debug, compact=options.compact)
+                    except ConversionError as e:
+                        print(f"❌ {label}: {e}", file=sys.stderr)
+                        failed += 1
+                        continue
+                    render_document(data, sink, options)
+            except (ConversionError, OSError) as e:
+                print(f"❌ {file_path}: {e}", file=sys.stderr)
+                failed += 1
+    return 1 if failed else 0
@@ -0,0 +1,205 @@
+"""Command line interface; heavier modules are imported only by the mode that needs them."""
+
+import argparse
+import os
+
+from . import config
+from .options import BuildOptions, ConfigError, apply_overrides, load_overrides, parse_override
+
+# === CLI ===
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="ktdash_converter",
+                                     description="Convert ktdash.app roster pages into standalone HTML overviews.")
+    parser.add_argument("inputs", nargs="*",
+                        help=f"ktdash_*.html pages or .zip/.tar(.gz) exports of them (default: all pages in {config.BASE_INPUT_PATH_HTML})")
+    parser.add_argument("--output-dir", "-o", help=f"where pages are written (default: {config.BASE_OUTPUT_PATH_HTML})")
+    parser.add_argument("--output-archive", metavar="FILE",
+                        help="write all pages into one .zip or .tar(.gz) archive instead of --output-dir")
+    parser.add_argument("--config", action="append", default=[], metavar="FILE",
+                        help="JSON object of setting overrides, e.g. {\"CSS_MODE\": \"external\"} (repeatable)")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="override one setting; VALUE is JSON or a plain string (repeatable, applied after --config)")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="worker processes (0 = one per CPU)")
+    parser.add_argument("--debug", action="store_true", default=None, help="write intermediate JSON dumps")
+    parser.add_argument("--css", choices=["inline", "external"], default=None,
+                        help=f"embed the stylesheet in each page, or link one shared content-hashed file (default: {config.CSS_MODE})")
+    parser.add_argument("--minify", action="store_true",
+                        help="write pages and CSS without indentation and separating newlines (<pre> and roster HTML kept as-is)")
+    parser.add_argument("--gzip", nargs="?", type=int, const=None, default=0, metavar="LEVEL",
+                        help=f"also write .gz companions for static hosting, unless unchanged (default level: {config.GZIP_LEVEL})")
+    parser.add_argument("--compact", action="store_true",
+                        help="load rosters with interned strings and slotted records (less memory for many teams)")
+    parser.add_argument("--profile", action="store_true",
+                        help="write per-stage time/memory reports to --profile-dir (cached pages are not profiled)")
+    parser.add_argument("--profile-dir", default=None, help=f"profile report directory (default: {config.PROFILE_DIR})")
+    parser.add_argument("--watch", nargs="?", const="", metavar="DIR",
+                        help=f"stay running and reconvert ktdash_* pages in DIR as they change (default: {config.BASE_INPUT_PATH_HTML})")
+    parser.add_argument("--interval", type=float, default=None,
+                        help=f"--watch poll interval in seconds (default: {config.WATCH_INTERVAL})")
+    parser.add_argument("--debounce", type=float, default=None,
+                        help=f"--watch: seconds a page must stay unchanged before it is reconverted (default: {config.WATCH_DEBOUNCE})")
+    parser.add_argument("--serve", nargs="?", const="", metavar="DIR",
+                        help=f"serve /<killteamid>.html, rendered on demand from ktdash_* pages in DIR (default: {config.BASE_INPUT_PATH_HTML})")
+    parser.add_argument("--host", default=None, help=f"--serve address (default: {config.SERVE_HOST})")
+    parser.add_argument("--port", type=int, default=None, help=f"--serve port (default: {config.SERVE_PORT})")
+    parser.add_argument("--serve-cache-size", type=int, default=None,
+                        help=f"rendered pages --serve keeps in memory (default: {config.SERVE_CACHE_SIZE})")
+    parser.add_argument("--index-db", default=None, help=f"roster index path (default: {config.ROSTER_INDEX})")
+    parser.add_argument("--ingest", action="store_true", help="add the input pages to the roster index instead of converting them")
+    parser.add_argument("--from-index", nargs="*", metavar="KILLTEAMID",
+                        help="render pages from the roster index (default: every indexed team)")
+    parser.add_argument("--find-rule", metavar="RULE",
+                        help="list weapon profiles with a special rule (e.g. Lethal) across the indexed teams")
+    parser.add_argument("--compare", action="store_true",
+                        help=f"write a cross-team weapon comparison page ({config.COMPARE_PAGE}) instead of the team pages")
+    parser.add_argument("--compendium", action="store_true",
+                        help=f"write every roster into one page ({config.COMPENDIUM_PAGE}) with a table of contents")
+    parser.add_argument("--ndjson", metavar="FILE",
+                        help="export the cleaned rosters as NDJSON to FILE (\"-\" for stdout) instead of rendering pages")
+    parser.add_argument("--ndjson-granularity", choices=["roster", "operative", "weapon"], default=None,
+                        help=f"one NDJSON record per roster, operative or weapon (default: {config.NDJSON_GRANULARITY})")
+    parser.add_argument("--fetch", nargs="+", metavar="TEAM",
+                        help=f"download pages first (URLs, FACTIONID/KILLTEAMID or KILLTEAMID on {config.FETCH_BASE_URL}), then convert them")
+    parser.add_argument("--fetch-only", action="store_true", help="with --fetch: download, but do not convert")
+    parser.add_argument("--stdout", action="store_true", help="stream the rendered page(s) to stdout instead of writing files")
+    parser.add_argument("--force", action="store_true", help="rebuild every page, ignoring the build manifest")
+    parser.add_argument("--manifest", default=None, help=f"build manifest path (default: {config.BUILD_MANIFEST})")
+    parser.add_argument("--no-cache", action="store_true", help="neither read nor write the build manifest")
+    return parser
+
+def configure(args):
+    """Apply --config files, --set and --output-dir (in that order) and return the overrides."""
+    overrides = []
+    for path in args.config:
+        overrides.extend(load_overrides(path))
+    overrides.extend(parse_override(assignment) for assignment in args.set)
+    if args.output_dir:
+        overrides.append(("BASE_OUTPUT_PATH_HTML", args.output_dir))
+    apply_overrides(overrides)
+    return tuple(overrides)
+
+def compile_render_plans():
+    """
+    Compile the render plans before any work, so config errors stop the run up
+    front. Only modes that render call this: the plans pull in the renderer.
+    """
+    from .plans import get_render_plans
+    try:
+        get_render_plans()
+    except ConfigError as e:
+        print(f"❌ {e}")
+        return False
+    return True
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    # Overrides go in before anything reads the config: the defaults below and in every module are read after this
+    try:
+        overrides = configure(args)
+    except ConfigError as e:
+        print(f"❌ {e}")
+        return 2
+
+    options = BuildOptions(
+        debug=args.debug,
+        css=args.css,
+        profile=args.profile,
+        profile_dir=args.profile_dir,
+        compact=args.compact,
+        minify=args.minify,
+        gzip=config.GZIP_LEVEL if args.gzip is None else args.gzip,
+        overrides=overrides,
+    )
+
+    if args.find_rule:
+        from .index import print_weapons_with_rule
+        return print_weapons_with_rule(args.index_db, args.find_rule)
+    if args.from_index is not None:
+        if not compile_render_plans():
+            return 2
+        from .index import render_from_index
+        return render_from_index(args.index_db, args.from_index, options)
+    if args.serve is not None:
+        if not compile_render_plans():
+            return 2
+        from .server import serve
+        return serve(args.serve or None, options, host=args.host, port=args.port, max_pages=args.serve_cache_size)
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    manifest_path = False if args.no_cache else args.manifest or config.BUILD_MANIFEST
+
+    if args.watch is not None:
+        if not compile_render_plans():
+            return 2
+        from .watch import watch
+        return watch(args.watch or None, options, manifest_path, interval=args.interval, debounce=args.debounce)
+
+    if args.fetch:
+        from .fetch import fetch_pages
+        fetched = fetch_pages(args.fetch)
+        if any(result["error"] is not None for result in fetched):
+            print("❌ Not converting anything until every page could be fetched")
+            return 1
+        if args.fetch_only:
+            return 0
+        file_paths = args.inputs + [result["output"] for result in fetched]
+    else:
+        from .inputs import find_input_files
+        file_paths = args.inputs or find_input_files()
+
+    if args.compare:
+        from .compare import write_comparison
+        return write_comparison(file_paths, options)
+    if args.compendium:
+        if not compile_render_plans():
+            return 2
+        from .compendium import write_compendium
+        return write_compendium(file_paths, options)
+    if args.ndjson:
+        from .export import export_ndjson
+        return export_ndjson(file_paths, args.ndjson, args.ndjson_granularity, compact=args.compact)
+
+    from .inputs import archive_kind
+    archive_paths = [path for path in file_paths if archive_kind(path)]
+    page_paths = [path for path in file_paths if not archive_kind(path)]
+
+    if args.ingest:
+        if args.stdout or args.output_archive:
+            print("❌ --ingest cannot be combined with --stdout or --output-archive")
+            return 2
+        if archive_paths:
+            print(f"❌ --ingest indexes plain ktdash_* pages, not archives: {', '.join(archive_paths)}")
+            return 2
+        from .index import ingest
+        return ingest(file_paths, args.index_db, force=args.force)
+
+    if not compile_render_plans():
+        return 2
+    if args.stdout:
+        if args.output_archive:
+            print("❌ --stdout cannot be combined with --output-archive")
+            return 2
+        from .batch import write_to_stdout
+        return write_to_stdout(file_paths, options)
+
+    if args.output_archive:
+        from .archive import convert_archives  # Imported here: zipfile and tarfile only load for archives
+        if archive_kind(args.output_archive) is None:
+            print(f"❌ --output-archive must end in one of: {', '.join((*config.ZIP_SUFFIXES, *config.TAR_SUFFIXES))}")
+            return 2
+        results = convert_archives(file_paths, options, args.output_archive)
+        return 1 if any(result["error"] is not None for result in results) else 0
+
+    # Plain pages keep the build manifest, --jobs and --profile; archive members are converted one at a time
+    results = []
+    if page_paths or not archive_paths:
+        from .batch import run_batch
+        results += run_batch(page_paths, jobs=jobs, options=options, manifest_path=manifest_path, force=args.force)
+    if archive_paths:
+        from .archive import convert_archives
+        if jobs > 1 or args.profile:
+            print("⚠️ --jobs and --profile apply to plain pages only: archive members are converted one at a time")
+        results += convert_archives(archive_paths, options)
+    return 1 if any(result["error"] is not None for result in results) else 0
@@ -0,0 +1,230 @@
+"""--compare: columnar weapon-profile store and a cross-team comparison page."""
+
+import os
+import re
+from array import array
+from html import escape
+
+from . import config
+from .archive import iter_pages
+from .extract import CompactLoader, ConversionError, clean_and_flatten_stream
+from .minify import minify_markup
+from .options import BuildOptions
+from .sinks import open_sink, update_gzip_companion
+from .stylesheet import prepare_stylesheet, stylesheet_head
+from .text import escape_cell
+
+# === PROFILE STORE ===
+
+ATTACKS_PATTERN = re.compile(r"\s*(\d+)\s*")
+HIT_PATTERN = re.compile(r"\s*([1-6])\+\s*")
+DAMAGE_PATTERN = re.compile(r"\s*(\d+)\s*/\s*(\d+)\s*")
+LETHAL_PATTERN = re.compile(r"\bLethal\s*([2-6])\+", re.IGNORECASE)
+HIT_THRESHOLDS = range(2, 7)  # "2+" .. "6+"
+STAT_LIMIT = 2 ** (8 * array("I").itemsize) - 1  # Largest attacks/damage value the "I" columns hold
+
+def parse_profile(profile):
+    """
+    (attacks, hit, normal damage, critical damage, crit on) from A/BS/D/SR,
+    or None if not numeric ('-') or too large for the store's columns.
+    """
+    attacks = ATTACKS_PATTERN.fullmatch(str(profile.get("A", "")))
+    hit = HIT_PATTERN.fullmatch(str(profile.get("BS", "")))
+    damage = DAMAGE_PATTERN.fullmatch(str(profile.get("D", "")))
+    if not (attacks and hit and damage):
+        return None
+    if max(int(attacks.group(1)), int(damage.group(1)), int(damage.group(2))) > STAT_LIMIT:
+        return None
+    lethal = LETHAL_PATTERN.search(str(profile.get("SR") or ""))
+    return (int(attacks.group(1)), int(hit.group(1)), int(damage.group(1)), int(damage.group(2)),
+            int(lethal.group(1)) if lethal else 6)
+
+
+class ProfileStore:
+    """
+    Weapon profiles of many rosters as parallel columns, one row per profile:
+    the numeric stats in typed arrays, labels in lists, the team as an index
+    into `teams`. Aggregates are single passes over the columns.
+    Profiles whose stats are not numbers ('-') or out of range are counted in `skipped`.
+    """
+
+    def __init__(self):
+        self.teams = []  # (killteamid, killteamname)
+        self.team = array("I")
+        self.weapon = []
+        self.profile = []
+        self.weptype = []
+        self.rules = []
+        self.attacks = array("I")
+        self.hit = array("B")
+        self.normal = array("I")
+        self.critical = array("I")
+        self.crit_on = array("B")
+        self.skipped = 0
+
+    def __len__(self):
+        return len(self.team)
+
+    def add_roster(self, data):
+        """Append the profiles of one roster's flattened operatives_weapons."""
+        team = len(self.teams)
+        self.teams.append((data.get("killteamid", "").upper(), data.get("killteamname", "")))
+        for weapon in data.get("operatives_weapons") or []:
+            for profile in weapon.get("profiles") or []:
+                stats = parse_profile(profile)
+                if stats is None:
+                    self.skipped += 1
+                    continue
+                attacks, hit, normal, critical, crit_on = stats
+                self.team.append(team)
+                self.weapon.append(weapon.get("wepname", ""))
+                self.profile.append(profile.get("name") or "")
+                self.weptype.append(weapon.get("weptype", ""))
+                self.rules.append(profile.get("SR") or "")
+                self.attacks.append(attacks)
+                self.hit.append(hit)
+                self.normal.append(normal)
+                self.critical.append(critical)
+                self.crit_on.append(crit_on)
+
+    def expected_damage(self):
+        """
+        Damage per activation against no save: A x (P(normal hit) x normal + P(crit) x crit).
+        Crits are 6s, or X+ with Lethal X+; a crit always hits.
+        """
+        expected = array("d")
+        for attacks, hit, normal, critical, crit_on in zip(self.attacks, self.hit, self.normal, self.critical, self.crit_on):
+            crit = (7 - crit_on) / 6
+            success = (7 - min(hit, crit_on)) / 6
+            expected.append(attacks * ((success - crit) * normal + crit * critical))
+        return expected
+
+    def team_averages(self, expected=None):
+        """Per team: profiles, mean attacks, mean hit chance, mean normal/crit damage, mean and max expected damage."""
+        expected = self.expected_damage() if expected is None else expected
+        size = len(self.teams)
+        count = array("I", bytes(4 * size))
+        sums = {name: array("d", bytes(8 * size)) for name in ("attacks", "hit_chance", "normal", "critical", "expected")}
+        best = array("d", bytes(8 * size))
+        for team, attacks, hit, normal, critical, value in zip(self.team, self.attacks, self.hit, self.normal, self.critical, expected):
+            count[team] += 1
+            sums["attacks"][team] += attacks
+            sums["hit_chance"][team] += (7 - hit) / 6
+            sums["normal"][team] += normal
+            sums["critical"][team] += critical
+            sums["expected"][team] += value
+            if value > best[team]:
+                best[team] = value
+        return [
+            {"killteamid": killteamid, "killteamname": name, "profiles": count[team],
+             **{field: total[team] / count[team] if count[team] else 0.0 for field, total in sums.items()},
+             "max_expected": best[team]}
+            for team, (killteamid, name) in enumerate(self.teams)
+        ]
+
+    def hit_distribution(self):
+        """Per team, how many profiles hit on 2+ .. 6+ (index 0 is 2+)."""
+        distribution = [array("I", bytes(4 * len(HIT_THRESHOLDS))) for _ in self.teams]
+        for team, hit in zip(self.team, self.hit):
+            distribution[team][min(max(hit, 2), 6) - 2] += 1
+        return distribution
+
+    def ranked(self, expected=None, limit=None):
+        """Row indexes by expected damage, highest first."""
+        expected = self.expected_damage() if expected is None else expected
+        rows = sorted(range(len(expected)), key=expected.__getitem__, reverse=True)
+        return rows[:limit] if limit else rows
+
+# === COMPARISON PAGE ===
+
+def number(value, digits=2):
+    return f"{value:.{digits}f}"
+
+def render_comparison(store, sink, options=None, top=None):
+    """The comparison page for a filled ProfileStore, streamed into `sink`."""
+    options = options or BuildOptions()
+    top = config.COMPARE_TOP_WEAPONS if top is None else top
+    expected = store.expected_damage()
+    title = f"Weapon Comparison - {len(store.teams)} Kill Teams"
+
+    head = [
+        "<!DOCTYPE html>",
+        "<html>",
+        "<head>",
+        "  <meta charset='UTF-8'>",
+        f"  <title>{escape(title)}</title>",
+        *stylesheet_head(options),
+        "</head>",
+        "<body>",
+        f"  <h1>{escape(title)}</h1>",
+    ]
+    if options.minify:
+        sink.separator = ""
+        head = [line.strip() for line in head]
+    sink.extend(head)
+    sink.add(f"<p>{len(store)} weapon profiles; expected damage is per activation against no save "
+             f"(crits on 6+, or Lethal X+). {store.skipped} profiles without usable numeric stats are left out.</p>")
+
+    sink.add("<h2>Average Damage per Team</h2>")
+    sink.add("<table>")
+    sink.add("<tr><th>Kill Team</th><th>Profiles</th><th>Atk</th><th>Hit %</th><th>Dmg</th><th>Crit Dmg</th>"
+             "<th>Expected Dmg</th><th>Best Expected</th></tr>")
+    for row in sorted(store.team_averages(expected), key=lambda team: team["expected"], reverse=True):
+        sink.add(f"<tr><td>{escape_cell(row['killteamname'])} ({escape_cell(row['killteamid'])})</td>"
+                 f"<td>{row['profiles']}</td><td>{number(row['attacks'])}</td><td>{number(100 * row['hit_chance'], 0)}</td>"
+                 f"<td>{number(row['normal'])}</td><td>{number(row['critical'])}</td>"
+                 f"<td>{number(row['expected'])}</td><td>{number(row['max_expected'])}</td></tr>")
+    sink.add("</table>")
+
+    sink.add("<h2>Hit Distribution</h2>")
+    sink.add("<table>")
+    sink.add("<tr><th>Kill Team</th>" + "".join(f"<th>{hit}+</th>" for hit in HIT_THRESHOLDS) + "</tr>")
+    for (killteamid, name), counts in zip(store.teams, store.hit_distribution()):
+        sink.add(f"<tr><td>{escape_cell(name)} ({escape_cell(killteamid)})</td>"
+                 + "".join(f"<td>{count}</td>" for count in counts) + "</tr>")
+    sink.add("</table>")
+
+    sink.add("<h2>Weapons Ranked by Expected Damage</h2>")
+    sink.add("<table>")
+    sink.add("<tr><th>#</th><th>Kill Team</th><th>Weapon</th><th>Ranged/Melee</th><th>Atk</th><th>Hit</th>"
+             "<th>Dmg</th><th>Wr</th><th>Expected Dmg</th></tr>")
+    for rank, row in enumerate(store.ranked(expected, top), start=1):
+        weapon = store.weapon[row]
+        if store.profile[row] and store.profile[row] != weapon:
+            weapon += f" ({store.profile[row]})"
+        sink.add(f"<tr><td>{rank}</td><td>{escape_cell(store.teams[store.team[row]][0])}</td><td>{escape_cell(weapon)}</td>"
+                 f"<td>{escape_cell(store.weptype[row])}</td><td>{store.attacks[row]}</td><td>{store.hit[row]}+</td>"
+                 f"<td>{store.normal[row]}/{store.critical[row]}</td><td>{escape_cell(store.rules[row])}</td>"
+                 f"<td>{number(expected[row])}</td></tr>")
+    sink.add("</table>")
+
+    footer = "<footer class='credits'><p>Generated from the ktdash_* pages of this batch.</p></footer>"
+    sink.add(minify_markup(footer) if options.minify else footer)
+    sink.add("</body></html>")
+
+def write_comparison(paths, options=None):
+    """Load the profiles of every page (plain or in zip/tar exports) and write the comparison page."""
+    os.makedirs(config.BASE_OUTPUT_PATH_HTML, exist_ok=True)
+    options = prepare_stylesheet(options or BuildOptions())
+    store = ProfileStore()
+    # The store keeps weapon names and rules of every roster: one loader shares them
+    compact = CompactLoader() if options.compact else False
+    failed = 0
+    for path in paths:
+        try:
+            for label, name, stream in iter_pages([path]):
+                try:
+                    store.add_roster(clean_and_flatten_stream(stream, name, compact=compact))
+                except ConversionError as e:
+                    print(f"❌ {label}: {e}")
+                    failed += 1
+        except (ConversionError, OSError) as e:
+            print(f"❌ {path}: {e}")
+            failed += 1
+
+    output_file_html = os.path.join(config.BASE_OUTPUT_PATH_HTML, config.COMPARE_PAGE)
+    with open_sink(output_file_html) as sink:
+        render_comparison(store, sink, options)
+    update_gzip_companion(output_file_html, options.gzip)
+    print(f"📊 Comparison page created: {output_file_html} ({len(store.teams)} teams, {len(store)} weapon profiles)")
+    return 1 if failed else 0
@@ -0,0 +1,143 @@
+"""--compendium: every roster of a batch in one page, with a table of contents and shared sections emitted once."""
+
+import os
+import shutil
+import tempfile
+from html import escape
+
+from . import config
+from .archive import iter_pages
+from .extract import ConversionError, clean_and_flatten_stream
+from .minify import minify_markup
+from .options import BuildOptions
+from .render import FOOTER_HTML, render_section, render_table
+from .sinks import HtmlSink, PartList, open_sink, update_gzip_companion
+from .stylesheet import prepare_stylesheet, stylesheet_head
+
+# === COMPENDIUM ===
+
+def team_anchor(killteam_id):
+    return f"team-{killteam_id}"
+
+class SharedSections:
+    """
+    Universal (killteamid "ALL") equipment tables, keyed by their rendered
+    HTML so identical sets are emitted once however many teams link to them.
+    """
+
+    def __init__(self):
+        self.tables = {}  # table HTML -> (anchor, [(killteamid, killteamname)])
+
+    def link(self, table_html, team):
+        if table_html not in self.tables:
+            number = len(self.tables) + 1
+            self.tables[table_html] = ("universal-equipment" if number == 1 else f"universal-equipment-{number}", [])
+        anchor, teams = self.tables[table_html]
+        teams.append(team)
+        return anchor
+
+    def render(self, out):
+        for number, (table_html, (anchor, teams)) in enumerate(self.tables.items(), start=1):
+            title = "Universal Equipment" if number == 1 else f"Universal Equipment ({number})"
+            used_by = ", ".join(f"<a href='#{team_anchor(escape(team_id))}'>{escape(name)}</a>" for team_id, name in teams)
+            out.add(f"<section id='{anchor}'>")
+            out.add(f"<h1>{title}</h1>")
+            out.add(f"<p>Used by: {used_by}</p>")
+            out.add(table_html)
+            out.add("</section>")
+
+
+def render_team(out, data, shared):
+    """One roster as a <section>, like render_document's main loop but with the universal equipment linked."""
+    killteam_name = data.get("killteamname", "Unnamed Kill Team")
+    current_killteam_id = data.get("killteamid", "").upper()
+    out.add(f"<section id='{team_anchor(escape(current_killteam_id))}'>")
+    out.add(f"<h1>{escape(killteam_name)}</h1>")
+
+    for key in config.RENDER_ORDER:
+        value = data.get(key)
+        if not value:
+            continue
+        if key == "equipments" and isinstance(value, list):
+            universal_equip = [e for e in value if e.get("killteamid", "").upper() == "ALL"]
+            other_equip = [e for e in value if e.get("killteamid", "").upper() != "ALL"]
+            render_section(out, key, other_equip, killteam_name, current_killteam_id)
+            if universal_equip:
+                table = PartList(out.separator)
+                render_table("equipments", universal_equip, add_header=False, sink=table)
+                anchor = shared.link(table.joined(), (current_killteam_id, killteam_name))
+                out.add("<h2>Universal Equipment</h2>")
+                out.add(f"<p>Shared by every team: see <a href='#{anchor}'>Universal Equipment</a>.</p>")
+        else:
+            render_section(out, key, value, killteam_name, current_killteam_id)
+
+    out.add("<p><a href='#contents'>Back to contents</a></p>")
+    out.add("</section>")
+
+def write_compendium(paths, options=None):
+    """
+    Render every page (plain or in zip/tar exports) into COMPENDIUM_PAGE.
+    Team sections are spooled to a temporary file as each roster loads, so
+    the table of contents can lead without holding every roster in memory.
+    """
+    os.makedirs(config.BASE_OUTPUT_PATH_HTML, exist_ok=True)
+    options = prepare_stylesheet(options or BuildOptions())
+    separator = "" if options.minify else "\n"
+    shared = SharedSections()
+    contents = []  # (killteamid, killteamname)
+    failed = 0
+
+    with tempfile.SpooledTemporaryFile(max_size=config.COMPENDIUM_SPOOL_SIZE, mode="w+", encoding="utf-8", newline="") as spool:
+        sections = HtmlSink(spool, separator)
+        for path in paths:
+            try:
+                for label, name, stream in iter_pages([path]):
+                    try:
+                        data = clean_and_flatten_stream(stream, name, debug=options.debug, compact=options.compact)
+                    except ConversionError as e:
+                        print(f"❌ {label}: {e}")
+                        failed += 1
+                        continue
+                    team = (data.get("killteamid", "").upper(), data.get("killteamname", "Unnamed Kill Team"))
+                    if any(team_id == team[0] for team_id, _ in contents):
+                        print(f"⚠️ Skipping {label}: {team[0]} is already in the compendium")
+                        continue
+                    contents.append(team)
+                    render_team(sections, data, shared)
+            except (ConversionError, OSError) as e:
+                print(f"❌ {path}: {e}")
+                failed += 1
+
+        output_file_html = os.path.join(config.BASE_OUTPUT_PATH_HTML, config.COMPENDIUM_PAGE)
+        with open_sink(output_file_html) as out:
+            out.separator = separator
+            head = [
+                "<!DOCTYPE html>",
+                "<html>",
+                "<head>",
+                "  <meta charset='UTF-8'>",
+                "  <title>Kill Team Compendium (Homebrew)</title>",
+                *stylesheet_head(options),
+                "</head>",
+                "<body>",
+                "  <h1>Kill Team Compendium (Homebrew)</h1>",
+            ]
+            out.extend([line.strip() for line in head] if options.minify else head)
+            out.add("<nav id='contents'>")
+            out.add("<h2>Contents</h2>")
+            out.add("<ul>" + "".join(f"<li><a href='#{team_anchor(escape(team_id))}'>{escape(name)}</a></li>"
+                                     for team_id, name in contents) + "</ul>")
+            out.add("</nav>")
+            if contents:
+                # The spooled sections are already separator-joined parts: copy them in as one
+                out.stream.write(separator)
+                spool.seek(0)
+                shutil.copyfileobj(spool, out.stream)
+            shared.render(out)
+            out.add(minify_markup(FOOTER_HTML) if options.minify else FOOTER_HTML)
+            out.add("</body></html>")
+
+    update_gzip_companion(output_file_html, options.gzip)
+    print(f"📚 Compendium created: {output_file_html} ({len(contents)} teams, "
+          f"{len(shared.tables)} shared equipment section(s))")
+    return 1 if failed else 0
@@ -0,0 +1,278 @@
+"""Every setting of the converter. Other modules read these as config.NAME, so overrides apply everywhere."""
+
+# === CONFIGURATION ===
+
+# Input and output file paths
+BASE_INPUT_PATH_HTML  = f"html/"
+INPUT_TEMP_JSON = "pretty_output.json"
+INTERMEDIATE_JSON  = "cleaned_output.json"
+INPUT_FLATTENED_JSON  = "flattened_output.json"
+BASE_OUTPUT_PATH_HTML  = "html/"
+
+# Write the intermediate JSON files above for inspection (off: stay in memory)
+DEBUG_DUMP_JSON = False
+
+# Roster extraction: the JSON lives in <body killteam="...">
+BODY_TAG = b"<body"
+KILLTEAM_ATTRIBUTE = b'killteam="'
+EXTRACT_CHUNK_SIZE = 64 * 1024  # Read size when scanning streams
+
+# Output: buffer size of the streaming HTML writer
+OUTPUT_BUFFER_SIZE = 64 * 1024
+
+# --gzip: compression level of the .html.gz (and .css.gz) companions written next to the pages
+GZIP_LEVEL = 9
+
+# Stylesheet: "inline" embeds it in every page, "external" writes one shared,
+# content-hashed ktdash.<hash>.css next to the pages and links it
+CSS_MODE = "inline"
+STYLESHEET_PREFIX = "ktdash"
+
+# Page stylesheet, as embedded between <style> tags in inline mode
+STYLESHEET_LINES = [
+    "    body { background: #1e1e1e; color: #d4d4d4; font-family: 'Segoe UI', sans-serif; padding: 2em; }",
+    "    h1, h2 { color: #D55F23; }",
+    "    table { border-collapse: collapse; width: 100%; margin-bottom: 2em; }",
+    "    th, td { border: 1px solid #333; padding: 8px; text-align: left; vertical-align: top; }",
+    "    th { background-color: #333; color: #ffffff; }",
+    "    tr:nth-child(even) { background-color: #2a2a2a; }",
+    "    tr:nth-child(odd) { background-color: #252526; }",
+    "    pre { background: #2d2d2d; padding: 1em; border-radius: 6px; overflow-x: auto; white-space: pre-wrap; }",
+    "    a { color: #D55F23; }",
+    "    .emphasis { font-weight: bold; }",
+    "    h2 { border-bottom: 2px solid #D55F23; padding-bottom: 0.25em; }",
+    "    h3 { color: #D55F23; margin-top: 1.5em; }",
+    "    table { margin-bottom: 1em; }",
+    "	.w5   { width: 5%; }",
+    "	.w10  { width: 10%; }",
+    "	.w15  { width: 15%; }",
+    "	.w20  { width: 20%; }",
+    "	.w25  { width: 25%; }",
+    "	.w30  { width: 30%; }",
+    "	.w35  { width: 35%; }",
+    "	.w40  { width: 40%; }",
+    "	.w45  { width: 45%; }",
+    "	.w50  { width: 50%; }",
+    "	.w55  { width: 55%; }",
+    "	.w60  { width: 60%; }",
+    "	.w65  { width: 65%; }",
+    "	.w70  { width: 70%; }",
+    "	.w75  { width: 75%; }",
+    "	.w80  { width: 80%; }",
+    "	.w85  { width: 85%; }",
+    "	.w90  { width: 90%; }",
+    "	.w95  { width: 95%; }",
+    "	.w100 { width: 100%; }",
+    "	.keywords-block {",
+    "	  margin-top: 1em;",
+    "	  font-size: 0.95em;",
+    "	  color: #cccccc;",
+    "	}",
+    "	",
+    "	.keyword-tag {",
+    "	  display: inline-block;",
+    "	  background-color: #333;",
+    "	  color: #D55F23;",
+    "	  border-radius: 12px;",
+    "	  padding: 0.2em 0.6em;",
+    "	  margin: 0.1em;",
+    "	  font-weight: 500;",
+    "	  font-size: 0.9em;",
+    "	  white-space: nowrap;",
+    "	}",
+    "	footer.credits {",
+    "	  border-top: 1px solid #444;",
+    "	  margin-top: 3em;",
+    "	  padding-top: 1.5em;",
+    "	  font-size: 0.9em;",
+    "	  color: #aaaaaa;",
+    "	}",
+    "	",
+    "	",
+    "	footer.credits a:hover {",
+    "	  text-decoration: underline;",
+    "	}",
+]
+
+# Rendered fragments (tables, profile blocks) reused across rosters; 0 disables
+FRAGMENT_CACHE_SIZE = 1024
+
+# Escaped cell texts ("3+", weapon rules, keywords) reused across cells and rosters; 0 disables
+ESCAPE_CACHE_SIZE = 4096
+
+# --profile: per-input and batch reports (wall time, tracemalloc peaks, counters)
+PROFILE_DIR = "profile/"
+
+# --watch: poll interval, and how long a page must stay unchanged before it is reconverted
+WATCH_INTERVAL = 0.5
+WATCH_DEBOUNCE = 0.3
+
+# --serve: local render server, and how many rendered pages it keeps (LRU)
+SERVE_HOST = "127.0.0.1"
+SERVE_PORT = 8000
+SERVE_CACHE_SIZE = 32
+
+# --ingest / --from-index / --find-rule: SQLite index of cleaned and flattened rosters
+ROSTER_INDEX = "ktdash_index.sqlite3"
+
+# --fetch: download ktdash_* pages into BASE_INPUT_PATH_HTML. A team is a full URL, or
+# "FACTIONID/KILLTEAMID" / a KILLTEAMID of FETCH_DEFAULT_FACTION on FETCH_BASE_URL
+FETCH_BASE_URL = "https://ktdash.app"
+FETCH_PAGE_PATH = "/fa/{factionid}/kt/{killteamid}"
+FETCH_DEFAULT_FACTION = "HBR"
+FETCH_MANIFEST = ".ktdash_fetch.json"  # ETag / Last-Modified per URL, for conditional requests
+FETCH_PER_HOST = 4  # Concurrent requests (and pooled keep-alive connections) per host
+FETCH_RETRIES = 3
+FETCH_BACKOFF = 0.5  # Seconds before the first retry, doubled for every further one
+FETCH_MAX_RETRY_AFTER = 60  # Cap on a server's Retry-After, in seconds
+FETCH_TIMEOUT = 30
+FETCH_USER_AGENT = "ktdash_converter"
+
+# Incremental builds: input/config hashes and output path per converted page
+BUILD_MANIFEST = ".ktdash_manifest.json"
+
+# Bulk exports: ktdash_* pages are read straight out of these archives (by file name suffix)
+ZIP_SUFFIXES = (".zip",)
+TAR_SUFFIXES = {  # Suffix -> tarfile write mode for --output-archive
+    ".tar": "w",
+    ".tar.gz": "w:gz",
+    ".tgz": "w:gz",
+    ".tar.bz2": "w:bz2",
+    ".tar.xz": "w:xz",
+}
+
+# --compare: cross-team weapon comparison page, written to BASE_OUTPUT_PATH_HTML
+COMPARE_PAGE = "compare.html"
+COMPARE_TOP_WEAPONS = 25  # Rows of the "ranked by expected damage" table
+
+# --compendium: every roster in one page, written to BASE_OUTPUT_PATH_HTML
+COMPENDIUM_PAGE = "compendium.html"
+COMPENDIUM_SPOOL_SIZE = 8 * 1024 * 1024  # Team sections kept in memory before spilling to a temporary file
+
+# --ndjson: one compact JSON record per "roster", "operative" or "weapon"
+NDJSON_GRANULARITY = "roster"
+
+# Input preprocessing
+INPUT_KEYS_TO_IGNORE = ["rosters"] # Keys to remove from top level
+
+INPUT_FLATTEN_TARGETS = {   # Nested keys to flatten recursively
+    "operatives": ["abilities", "weapons", "uniqueactions"],
+    "fireteams": ["operatives"]
+}
+
+FLATTEN_DEDUPLICATION_KEYS = {  # Child key -> field used to drop duplicates
+    "abilities": "title",
+    "weapons": "wepname",
+    "uniqueactions": "title"  # Adjust if you find the actual key used
+}
+
+# Blacklists
+BLACKLIST_KEYS = {
+    "fireteams",
+    "operatives_weapons",
+    "customkeyword",
+    "killteamname"
+}
+
+BLACKLIST_FIELDS = {
+    "factionid", "killteamid", "ployid", "ploytype", "eqcategory", "eqid",
+    "eqvar1", "eqvar2", "eqvar3", "eqvar4", "fireteamid", "opid", "eqpts",
+    "eqseq", "edition", "tacopid", "tacopseq", "abilityid", "isdefault",
+    "isselected", "wepid", "wepseq", "eqtype", "weapon", "name", "profileid"
+}
+
+# Table configuration
+HORIZONTAL_TABLES = {
+    "fireteams_operatives": [
+        ("M", "Move"),
+        ("APL", "APL"),
+        ("SV", "Save"),
+        ("W", "Wounds")
+    ]
+}
+
+# Section headers
+H1_HEADERS = {
+    "ploys": "Ploys",
+    "equipments": "Equipment List",
+    "tacops": "Tactical Objectives"
+    # Add more if needed
+}
+
+# Column layout per section
+COLUMN_CONFIG = {
+    "strat": [
+        ("ployname", "Name", "w20"),       # Short name
+        ("CP", "CP", "w5"),               # Small number
+        ("description", "Description", "w75")  # Most of the space
+    ],
+    "tac": [
+        ("ployname", "Name", "w20"),
+        ("CP", "CP", "w5"),
+        ("description", "Description", "w75")
+    ],
+    "equipments": [
+        ("eqname", "Name", "w20"),         # Can be slightly longer
+        ("eqdescription", "Description", "w80")
+    ],
+    "tacops": [
+        ("title", "Title", "w20"),         # Brief, but longer than a name
+        ("description", "Description", "w80")
+    ],
+    "operatives_abilities": [              # Faction Rules
+        ("title", "Title", "w10"),         # Often a short phrase
+        ("description", "Description", "w90")
+    ],
+    "abilities": [
+        ("title", "Title", "w10"),
+        ("description", "Description", "w90")
+    ],
+    "weapons": [
+        ("wepname", "Weapon", "w10"),      # Longer names like "Shuriken Catapult"
+        ("weptype", "Ranged/Melee", "w5"), # Short tag
+        ("profiles", "Profiles", "w85")    # Table goes here, needs width
+    ],
+    "profiles": [
+        ("A", "Atk", "w10"),
+        ("BS", "Hit", "w10"),
+        ("D", "Dmg", "w10"),
+        ("SR", "Wr", "w70")
+    ],
+}
+
+# Title overrides for display
+TITLE_OVERRIDES = {
+    "strat": "Strategic Ploys",
+    "tac": "Tactical Ploys",
+    "killteamname": "Kill Team",
+    "description": "Description",
+    "equipments": "Equipment",
+    "killteamcomp": "Operatives",
+    "tacops": "TacOps",
+    "operatives_abilities": "Faction Rules",
+    "operatives_uniqueactions": "Unique Actions for Operatives",
+    "fireteams_operatives": "Operatives",
+    "ploys": "Ploys"
+}
+
+# Fields to emphasize when rendering
+EMPHASIZE_FIELDS = {
+    "equipments": ("eqname", "eqtype"),
+    "tacops": ("title", "archetype")
+}
+
+# Rendering options
+SKIP_RENDER_KEYS = {"weapons", "abilities", "uniqueactions"}
+RENDER_ORDER = [
+    "description",
+    "killteamcomp",
+    "operatives_abilities",
+    "fireteams_operatives",
+    "ploys",
+    "equipments",
+    "tacops"
+]
+
+
+class ConfigError(ValueError):
+    """Raised when the rendering configuration is inconsistent."""
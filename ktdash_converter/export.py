@@ -0,0 +1,71 @@
+"""NDJSON export: one compact JSON record per roster, operative or weapon, streamed as each file finishes."""
+
+import json
+import sys
+from contextlib import nullcontext
+
+from . import config
+from .archive import iter_pages
+from .extract import ConversionError, clean_and_flatten_stream
+from .records import record_to_dict
+
+# === NDJSON EXPORT ===
+
+NDJSON_GRANULARITIES = ("roster", "operative", "weapon")
+
+def export_records(data, source, granularity=None):
+    """
+    The records one cleaned and flattened roster exports as. Operatives and
+    weapons carry their team (and operative) so every line stands on its own.
+    """
+    granularity = granularity or config.NDJSON_GRANULARITY
+    if granularity not in NDJSON_GRANULARITIES:
+        raise ValueError(f"Unknown NDJSON granularity {granularity!r}")
+    team = {"source": source, "killteamid": data.get("killteamid", "").upper(),
+            "killteamname": data.get("killteamname")}
+
+    if granularity == "roster":
+        yield {"source": source, **data}
+        return
+    for op in data.get("fireteams_operatives") or []:
+        if granularity == "operative":
+            yield {**team, **op}
+            continue
+        for weapon in op.get("weapons") or []:
+            yield {**team, "opname": op.get("opname"), **weapon}
+
+def ndjson_line(record):
+    return json.dumps(record, separators=(",", ":"), ensure_ascii=False, default=record_to_dict) + "\n"
+
+def export_ndjson(paths, destination="-", granularity=None, compact=False):
+    """
+    Write the records of every page (plain or inside a zip/tar export) to
+    `destination` ("-" for stdout), one line each. Output is flushed after
+    every roster, so consumers can read the library while it is exported.
+    """
+    granularity = granularity or config.NDJSON_GRANULARITY
+    status = sys.stderr if destination == "-" else sys.stdout  # Keep stdout clean NDJSON
+    rosters = records = failed = 0
+
+    with nullcontext(sys.stdout) if destination == "-" else open(destination, "w", encoding="utf-8") as out:
+        for path in paths:
+            try:
+                for label, name, stream in iter_pages([path]):
+                    try:
+                        data = clean_and_flatten_stream(stream, name, compact=compact)
+                        lines = [ndjson_line(record) for record in export_records(data, label, granularity)]
+                    except ConversionError as e:
+                        print(f"❌ {label}: {e}", file=status)
+                        failed += 1
+                        continue
+                    out.writelines(lines)
+                    out.flush()
+                    rosters += 1
+                    records += len(lines)
+            except (ConversionError, OSError) as e:
+                print(f"❌ {path}: {e}", file=status)
+                failed += 1
+
+    target = "stdout" if destination == "-" else destination
+    print(f"📤 {records} {granularity} records from {rosters} rosters written to {target}", file=status)
+    return 1 if failed else 0
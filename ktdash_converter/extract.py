@@ -0,0 +1,359 @@
+"""Loading a ktdash page: extract the embedded roster JSON, decode, clean and flatten it."""
+
+import html
+import json
+import mmap
+import re
+import sys
+from itertools import repeat
+from pathlib import Path
+
+from . import config
+from . import profiler
+from .records import CONTAINER_TYPES, MAPPING_TYPES, RECORD_KINDS, record_to_dict, record_type
+from .text import classify_string, classify_strings
+
+# === HTML STUFF
+
+class ConversionError(Exception):
+    """Raised when a ktdash page cannot be turned into a roster."""
+
+
+def debug_path_for(template, input_path_html):
+    # Per-input dump name, so parallel workers never share an intermediate file
+    template = Path(template)
+    return str(template.with_name(f"{Path(input_path_html).stem}_{template.name}"))
+
+def find_killteam_attribute(buf):
+    """
+    Locate the raw killteam="..." value in a bytes-like page (bytes or mmap).
+    Starts at <body (or the top if there is none) and stops at the closing quote.
+    """
+    pos = buf.find(config.BODY_TAG)
+    pos = 0 if pos == -1 else pos
+    while True:
+        start = buf.find(config.KILLTEAM_ATTRIBUTE, pos)
+        if start == -1:
+            return None
+        start += len(config.KILLTEAM_ATTRIBUTE)
+        end = buf.find(b'"', start)
+        if end == -1:
+            return None
+        if end > start:
+            return buf[start:end]
+        pos = end + 1  # empty attribute, keep looking
+
+def read_killteam_attribute(input_path_html):
+    """Memory-map the page and slice out the killteam attribute without reading the whole file."""
+    with open(input_path_html, "rb") as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty files cannot be mapped
+            return None
+        with buf:
+            return find_killteam_attribute(buf)
+
+KILLTEAM_ID_PATTERN = re.compile(rb"killteamid&quot;\s*:\s*&quot;([^&]*)&quot;")
+
+def killteam_id_from_attribute(raw):
+    """
+    The roster's killteamid without parsing the whole roster: it is the first
+    killteamid in the encoded attribute. Falls back to a full decode.
+    """
+    match = KILLTEAM_ID_PATTERN.search(raw)
+    if match:
+        return match.group(1).decode("utf-8").upper()
+    return decode_killteam_attribute(raw).get("killteamid", "").upper() or None
+
+def peek_killteam_id(input_path_html):
+    """killteam_id_from_attribute for a page on disk, or None if it has no killteam attribute."""
+    raw = read_killteam_attribute(input_path_html)
+    return None if raw is None else killteam_id_from_attribute(raw)
+
+class AttributeScanner:
+    """Incremental search for the first non-empty killteam="..." value in a byte stream fed chunk by chunk."""
+
+    def __init__(self):
+        self.in_value = False  # False: looking for killteam=", True: for the closing quote
+        self.pending = b""
+        self.value = bytearray()
+
+    def feed(self, chunk):
+        """The value once its closing quote has been fed, else None."""
+        buf = self.pending + chunk
+        self.pending = b""
+        while buf:
+            if not self.in_value:
+                marker = config.KILLTEAM_ATTRIBUTE
+                i = buf.find(marker)
+                if i == -1:
+                    # Keep enough of the tail to match a marker split across chunks
+                    self.pending = buf[-(len(marker) - 1):]
+                    return None
+                buf = buf[i + len(marker):]
+                self.in_value = True
+            else:
+                end = buf.find(b'"')
+                if end == -1:
+                    self.value += buf
+                    return None
+                self.value += buf[:end]
+                if self.value:
+                    return bytes(self.value)
+                buf = buf[end + 1:]
+                self.in_value = False  # empty attribute, keep looking
+        return None
+
+def read_killteam_attribute_stream(stream, chunk_size=None):
+    """
+    Same as read_killteam_attribute for a binary stream (archive member, socket, ...).
+    Reading stops at the attribute's closing quote. Until <body turns up, a second
+    scanner searches from the top in case the page has none, so at most one
+    attribute value is kept in memory, never the page.
+    """
+    chunk_size = chunk_size or config.EXTRACT_CHUNK_SIZE
+    marker = config.BODY_TAG
+    pending = b""
+    scanner = None  # Created at <body
+    fallback, fallback_value = AttributeScanner(), None  # From the top, for pages without <body
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return None if scanner is not None else fallback_value
+        if scanner is not None:
+            value = scanner.feed(chunk)
+            if value is not None:
+                return value
+            continue
+
+        if fallback_value is None:
+            fallback_value = fallback.feed(chunk)
+        buf = pending + chunk
+        i = buf.find(marker)
+        if i == -1:
+            pending = buf[-(len(marker) - 1):]
+            continue
+        fallback = fallback_value = None
+        scanner = AttributeScanner()
+        value = scanner.feed(buf[i + len(marker):])
+        if value is not None:
+            return value
+
+def decode_killteam_attribute(raw, compact=False):
+    """
+    Turn the raw, entity-encoded attribute bytes into the roster dict. With
+    `compact`, strings are interned and classified while parsing and
+    operatives, weapons and profiles become slotted records. `compact` may be
+    a CompactLoader to share its strings across rosters; True uses a fresh one.
+    """
+    # Unescape HTML entities
+    try:
+        decoded_json_str = html.unescape(raw.decode("utf-8"))
+    except UnicodeDecodeError as e:
+        raise ConversionError(f"killteam attribute is not valid UTF-8: {e}")
+
+    # Parse JSON
+    try:
+        if compact and not isinstance(compact, CompactLoader):
+            compact = CompactLoader()
+        data = json.loads(decoded_json_str, object_pairs_hook=compact.object_pairs_hook if compact else None)
+    except json.JSONDecodeError as e:
+        raise ConversionError(f"JSON parsing failed: {e}")
+    if not isinstance(data, dict):
+        raise ConversionError("killteam attribute is not a JSON object")
+    return data
+
+def convert_broken_json_from_file(input_path_html, debug=False, compact=False):
+    """
+    Extract the JSON roster embedded in a ktdash page and return it as a dict.
+    Raises ConversionError if the file or the killteam attribute cannot be read.
+    """
+    # Step 1: Map the file and slice out the killteam="..." attribute from <body ...>
+    try:
+        with profiler.PROFILER.stage("extract_attribute"):
+            raw = read_killteam_attribute(input_path_html)
+    except FileNotFoundError:
+        raise ConversionError(f"File '{input_path_html}' not found.")
+    if raw is None:
+        raise ConversionError("No killteam attribute found in HTML.")
+
+    # Step 2: Unescape and parse only that slice
+    with profiler.PROFILER.stage("decode_json"):
+        data = decode_killteam_attribute(raw, compact=compact)
+
+    # Step 3: Optionally pretty-print JSON to file for inspection
+    if debug:
+        temp_json = debug_path_for(config.INPUT_TEMP_JSON, input_path_html)
+        dump_json(data, temp_json)
+        print(f"✔️ Pretty JSON written to '{temp_json}'.")
+    return data
+
+def dump_json(data, output_path):
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4, default=record_to_dict)
+
+def remove_keys(data, keys_to_ignore):
+    for key in keys_to_ignore:
+        if key in data:
+            del data[key]
+    return data
+
+
+def find_and_flatten(data, target_key, child_key):
+    """
+    Find all dictionaries with key `target_key`, and if their value is a list
+    of dicts that contain `child_key`, collect all such child_key values.
+    """
+    return collect_flatten_targets(data, {target_key: [child_key]})[(target_key, child_key)]
+
+
+def collect_flatten_targets(data, targets, deduplication_keys=None):
+    """
+    Collect every configured (target, child) combination in a single walk.
+
+    The walk is iterative (an explicit stack of iterators, so no recursion
+    limit) and visits nodes in the same pre-order as a recursive walk. A walk
+    for one target does not descend into that target's own lists, so each
+    frame carries the set of targets that are blocked below it. Items are
+    deduplicated by `deduplication_keys[child]` as they are collected.
+    """
+    deduplication_keys = deduplication_keys or {}
+    collected = {(t, c): [] for t, children in targets.items() for c in children}
+    seen = {pair: set() for pair in collected}
+    all_blocked = frozenset(targets)
+
+    def frame(obj, blocked):
+        items = obj.items() if isinstance(obj, MAPPING_TYPES) else zip(repeat(None), obj)
+        return iter(items), blocked
+
+    stack = [frame(data, frozenset())]
+    while stack:
+        items, blocked = stack[-1]
+        for key, value in items:
+            value_blocked = blocked
+            if key in targets and isinstance(value, list):
+                value_blocked = blocked | {key}
+                if key not in blocked:
+                    for child_key in targets[key]:
+                        found = collected[(key, child_key)]
+                        dedup_key = deduplication_keys.get(child_key)
+                        for item in value:
+                            if not (isinstance(item, MAPPING_TYPES) and child_key in item):
+                                continue
+                            if not dedup_key:
+                                found.extend(item[child_key])
+                                continue
+                            already_seen = seen[(key, child_key)]
+                            for child in item[child_key]:
+                                identifier = child.get(dedup_key)
+                                if identifier and identifier not in already_seen:
+                                    already_seen.add(identifier)
+                                    found.append(child)
+            if isinstance(value, CONTAINER_TYPES) and value and value_blocked != all_blocked:
+                stack.append(frame(value, value_blocked))
+                break
+        else:
+            stack.pop()
+    return collected
+
+
+def flatten_all(data, targets):
+    """
+    targets = {
+        "operatives": ["abilities", "weapons", "uniqueactions"]
+    }
+    Adds a deduplicated `<target>_<child>` list for each pair, in one pass.
+    """
+    collected = collect_flatten_targets(data, targets, config.FLATTEN_DEDUPLICATION_KEYS)
+    for (target_key, child_key), items in collected.items():
+        data[f"{target_key}_{child_key}"] = items
+    return data
+
+
+def clean_and_flatten(input_path_html, debug=False, compact=False):
+    """
+    Pipeline: extract -> remove keys -> flatten -> classify. The roster dict is handed from
+    stage to stage in memory; intermediate dumps are only written with `debug`.
+    """
+    # === Load broken JSON from https://ktdash.app/ ===
+    json_data = convert_broken_json_from_file(input_path_html, debug=debug, compact=compact)
+    return prepare_roster(json_data, input_path_html, debug=debug)
+
+def clean_and_flatten_stream(stream, name, debug=False, compact=False):
+    """
+    clean_and_flatten for a page read from a binary stream, such as an archive
+    member. Only the killteam attribute is buffered, never the whole page.
+    """
+    with profiler.PROFILER.stage("extract_attribute"):
+        raw = read_killteam_attribute_stream(stream)
+    if raw is None:
+        raise ConversionError("No killteam attribute found in HTML.")
+    with profiler.PROFILER.stage("decode_json"):
+        json_data = decode_killteam_attribute(raw, compact=compact)
+    if debug:
+        temp_json = debug_path_for(config.INPUT_TEMP_JSON, name)
+        dump_json(json_data, temp_json)
+        print(f"✔️ Pretty JSON written to '{temp_json}'.")
+    return prepare_roster(json_data, name, debug=debug)
+
+def prepare_roster(json_data, input_path_html, debug=False):
+    """Remove keys, flatten and classify a decoded roster (named after its page for debug dumps)."""
+    # === Step 1: Remove unwanted keys ===
+    with profiler.PROFILER.stage("remove_keys"):
+        cleaned_data = remove_keys(json_data, config.INPUT_KEYS_TO_IGNORE)
+    if debug:
+        cleaned_json = debug_path_for(config.INTERMEDIATE_JSON, input_path_html)
+        dump_json(cleaned_data, cleaned_json)
+        print(f"🧹 Cleaned JSON written to {cleaned_json} (without: {', '.join(config.INPUT_KEYS_TO_IGNORE)})")
+
+    # === Step 2: Flatten deeply nested shared children ===
+    with profiler.PROFILER.stage("flatten_all"):
+        flattened_data = flatten_all(cleaned_data, config.INPUT_FLATTEN_TARGETS)
+    if debug:
+        flattened_json = debug_path_for(config.INPUT_FLATTENED_JSON, input_path_html)
+        dump_json(flattened_data, flattened_json)
+        print(f"📦 Deep-flattened JSON written to {flattened_json}")
+
+    # === Step 3: Classify strings as plain text or HTML, once ===
+    with profiler.PROFILER.stage("classify_strings"):
+        classify_strings(flattened_data)
+    return flattened_data
+
+# === COMPACT LOADER ===
+
+class CompactLoader:
+    """
+    One load session of the compact loader: the shared classified (PlainText/HtmlText)
+    instance of each string, across every roster decoded with it. The table lives as
+    long as the loader, so a long-running process never accumulates strings.
+    """
+
+    def __init__(self):
+        # Keyed by the instance itself: it hashes and compares like the raw str, so a lookup
+        # with the raw string finds it without the table keeping the raw string alive.
+        self.strings = {}
+
+    def intern_value(self, value):
+        if type(value) is not str:
+            return value
+        text = self.strings.get(value)
+        if text is None:
+            text = classify_string(value)
+            self.strings[text] = text
+            profiler.PROFILER.count("strings_interned")
+        return text
+
+    def object_pairs_hook(self, pairs):
+        """
+        json.loads object_pairs_hook: interns keys and string values and turns
+        operatives, weapons and profiles into Record instances.
+        """
+        fields = tuple(sys.intern(key) for key, _ in pairs)
+        values = [self.intern_value(value) for _, value in pairs]
+        for marker, kind in RECORD_KINDS.items():
+            if marker in fields:
+                cls = record_type(kind, fields)
+                if cls is not None:
+                    return cls(values)
+                break
+        return dict(zip(fields, values))
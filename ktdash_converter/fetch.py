@@ -0,0 +1,223 @@
+"""--fetch: download ktdash roster pages concurrently, with pooled keep-alive connections and conditional requests."""
+
+import asyncio
+import gzip
+import http.client
+import os
+import re
+import time
+from collections import defaultdict
+from urllib.parse import urljoin, urlsplit
+
+from . import config
+from .extract import ConversionError, find_killteam_attribute, killteam_id_from_attribute, peek_killteam_id
+from .manifest import load_manifest, save_manifest
+
+# === FETCH ===
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_ERRORS = (OSError, http.client.HTTPException)  # Connection refused/reset, timeouts, bad responses
+PAGE_NAME_PATTERN = re.compile(r"[^a-z0-9_-]+")
+
+class FetchError(Exception):
+    """A page could not be downloaded (after retries) or is not a roster page."""
+
+
+def page_url(team):
+    """A full URL as given; "FACTIONID/KILLTEAMID" or a bare KILLTEAMID (of FETCH_DEFAULT_FACTION) on FETCH_BASE_URL."""
+    if "://" in team:
+        return team
+    factionid, _, killteamid = team.rpartition("/")
+    path = config.FETCH_PAGE_PATH.format(factionid=factionid or config.FETCH_DEFAULT_FACTION, killteamid=killteamid)
+    return urljoin(config.FETCH_BASE_URL, path)
+
+def page_path(url, folder_path=None):
+    """html/ktdash_<last path segment>.html, e.g. .../kt/GK24 -> ktdash_gk24.html"""
+    segment = urlsplit(url).path.rstrip("/").rpartition("/")[2]
+    name = PAGE_NAME_PATTERN.sub("_", os.path.splitext(segment)[0].lower()).strip("_") or "index"
+    return os.path.join(folder_path or config.BASE_INPUT_PATH_HTML, f"ktdash_{name}.html")
+
+def known_pages(folder_path):
+    """killteamid -> the ktdash_* page already holding that roster, so a download replaces it instead of duplicating it."""
+    pages = {}
+    with os.scandir(folder_path) as entries:
+        for entry in sorted(entries, key=lambda entry: entry.name):
+            if entry.name.startswith("ktdash_") and entry.is_file():
+                try:
+                    killteam_id = peek_killteam_id(entry.path)
+                except (OSError, ConversionError):
+                    continue
+                if killteam_id:
+                    pages.setdefault(killteam_id, entry.path)
+    return pages
+
+
+class ConnectionPool:
+    """
+    Idle keep-alive connections per (scheme, host, port), handed to worker
+    threads one request at a time. A semaphore per host caps how many
+    requests run against it at once.
+    """
+
+    def __init__(self, per_host=None, timeout=None):
+        self.per_host = per_host or config.FETCH_PER_HOST
+        self.timeout = timeout or config.FETCH_TIMEOUT
+        self.idle = defaultdict(list)
+        self.semaphores = {}
+        self.opened = 0
+
+    def semaphore(self, key):
+        if key not in self.semaphores:
+            self.semaphores[key] = asyncio.Semaphore(self.per_host)
+        return self.semaphores[key]
+
+    def acquire(self, key):
+        """(connection, reused)"""
+        if self.idle[key]:
+            return self.idle[key].pop(), True
+        scheme, host, port = key
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        self.opened += 1
+        return connection_class(host, port, timeout=self.timeout), False
+
+    def release(self, key, connection, reusable):
+        if reusable:
+            self.idle[key].append(connection)
+        else:
+            connection.close()
+
+    def close(self):
+        for connections in self.idle.values():
+            for connection in connections:
+                connection.close()
+        self.idle.clear()
+
+
+def send_request(connection, target, headers):
+    """Blocking GET on one connection (run in a worker thread): (status, headers, body, reusable)."""
+    connection.request("GET", target, headers=headers)
+    response = connection.getresponse()
+    body = response.read()
+    if response.getheader("Content-Encoding", "").lower() == "gzip":
+        body = gzip.decompress(body)
+    return response.status, response.headers, body, not response.will_close
+
+def conditional_headers(entry, path):
+    """If-None-Match / If-Modified-Since from the last download, as long as that file is still there."""
+    headers = {"Accept-Encoding": "gzip", "User-Agent": config.FETCH_USER_AGENT}
+    if entry and os.path.isfile(path):
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+def retry_delay(attempt, response_headers=None):
+    """Exponential backoff; a numeric Retry-After (up to FETCH_MAX_RETRY_AFTER) wins when the server sends one."""
+    retry_after = response_headers.get("Retry-After") if response_headers is not None else None
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), config.FETCH_MAX_RETRY_AFTER)
+    return config.FETCH_BACKOFF * 2 ** attempt
+
+async def fetch_url(pool, url, headers, retries=None):
+    """GET with retries on connection errors and 429/5xx: (status, headers, body)."""
+    retries = config.FETCH_RETRIES if retries is None else retries
+    parts = urlsplit(url)
+    key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+    target = parts.path or "/"
+    if parts.query:
+        target += f"?{parts.query}"
+
+    attempt = 0
+    async with pool.semaphore(key):
+        while True:
+            connection, reused = pool.acquire(key)
+            try:
+                status, response_headers, body, reusable = await asyncio.to_thread(send_request, connection, target, headers)
+            except RETRY_ERRORS as e:
+                connection.close()
+                if reused:
+                    continue  # The server dropped an idle keep-alive connection: retry on a fresh one right away
+                if attempt >= retries:
+                    raise FetchError(f"{type(e).__name__}: {e}")
+                await asyncio.sleep(retry_delay(attempt))
+                attempt += 1
+                continue
+            pool.release(key, connection, reusable)
+            if status in RETRY_STATUSES and attempt < retries:
+                await asyncio.sleep(retry_delay(attempt, response_headers))
+                attempt += 1
+                continue
+            return status, response_headers, body
+
+async def fetch_page(pool, team, manifest, folder_path=None, pages=None):
+    """
+    Download one page unless unchanged; the result dict matches the batch results.
+    A roster already in `pages` (killteamid -> path) is written over that page.
+    """
+    url = page_url(team)
+    entry = manifest.get(url)
+    path = (entry or {}).get("output") or page_path(url, folder_path)
+    result = {"input": url, "output": path, "error": None, "cached": False}
+    try:
+        status, headers, body = await fetch_url(pool, url, conditional_headers(entry, path))
+        if status == 304:
+            result["cached"] = True
+            return result
+        if status != 200:
+            raise FetchError(f"HTTP {status}")
+        raw = find_killteam_attribute(body)
+        if raw is None:
+            raise FetchError("no killteam attribute in the page (not a ktdash roster page?)")
+        killteam_id = killteam_id_from_attribute(raw)
+    except (FetchError, ConversionError) as e:
+        result["output"] = None
+        result["error"] = str(e)
+        return result
+
+    if pages is not None and killteam_id:
+        path = result["output"] = pages.setdefault(killteam_id, path)
+
+    # Write-then-rename so a converter or watcher never reads a half-written page
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(body)
+    os.replace(temp_path, path)
+    manifest[url] = {"etag": headers.get("ETag"), "last_modified": headers.get("Last-Modified"),
+                     "output": path, "fetched_at": time.time()}
+    return result
+
+async def fetch_all(teams, folder_path=None, manifest=None, pages=None):
+    pool = ConnectionPool()
+    try:
+        return await asyncio.gather(*(fetch_page(pool, team, manifest, folder_path, pages) for team in teams))
+    finally:
+        pool.close()
+
+def fetch_pages(teams, folder_path=None, manifest_path=None):
+    """
+    Download the ktdash_* pages for team URLs or ids into `folder_path`,
+    concurrently. Pages the server reports unchanged (304) are kept, and a
+    roster that already has a ktdash_* page there is written over it.
+    Returns the results in input order.
+    """
+    folder_path = folder_path or config.BASE_INPUT_PATH_HTML
+    manifest_path = manifest_path or config.FETCH_MANIFEST
+    os.makedirs(folder_path, exist_ok=True)
+    manifest = load_manifest(manifest_path)
+    start = time.perf_counter()
+    results = asyncio.run(fetch_all(teams, folder_path, manifest, known_pages(folder_path)))
+    save_manifest(manifest_path, manifest)
+
+    failed = [r for r in results if r["error"] is not None]
+    unchanged = sum(1 for r in results if r["cached"])
+    print(f"\n=== Fetch summary: {len(results) - len(failed) - unchanged} downloaded, {unchanged} unchanged, "
+          f"{len(failed)} failed ({time.perf_counter() - start:.1f}s) ===")
+    for result in results:
+        if result["error"] is not None:
+            print(f"❌ {result['input']}: {result['error']}")
+        elif result["cached"]:
+            print(f"⏭️ {result['input']} -> {result['output']} (unchanged)")
+        else:
+            print(f"📥 {result['input']} -> {result['output']}")
+    return results
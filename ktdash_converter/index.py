@@ -0,0 +1,259 @@
+"""SQLite roster index: incremental ingest, rendering from the index and cross-team queries."""
+
+import json
+import os
+import re
+import sqlite3
+import time
+from contextlib import closing
+
+from . import config
+from .extract import ConversionError, clean_and_flatten
+from .manifest import config_fingerprint, file_sha256
+from .options import BuildOptions
+from .sinks import open_sink, update_gzip_companion
+from .stylesheet import prepare_stylesheet
+from .text import classify_strings
+
+# === ROSTER INDEX ===
+
+ROSTER_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS teams (
+    killteamid TEXT PRIMARY KEY,
+    killteamname TEXT,
+    factionid TEXT,
+    edition TEXT,
+    source TEXT NOT NULL,
+    source_sha256 TEXT NOT NULL,
+    config_sha256 TEXT NOT NULL,
+    indexed_at REAL NOT NULL,
+    roster TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS operatives (
+    killteamid TEXT NOT NULL, fireteamid TEXT, opid TEXT, opseq INTEGER, opname TEXT,
+    M TEXT, APL TEXT, GA TEXT, DF TEXT, SV TEXT, W TEXT, keywords TEXT, data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS weapons (
+    killteamid TEXT NOT NULL, opid TEXT, wepid TEXT, wepseq INTEGER, wepname TEXT, weptype TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS weapon_profiles (
+    killteamid TEXT NOT NULL, opid TEXT, wepid TEXT, wepname TEXT, profileid TEXT, name TEXT,
+    A TEXT, BS TEXT, D TEXT, SR TEXT
+);
+CREATE TABLE IF NOT EXISTS weapon_rules (
+    killteamid TEXT NOT NULL, opid TEXT, wepid TEXT, profileid TEXT, rule TEXT NOT NULL, rule_name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS abilities (
+    killteamid TEXT NOT NULL, opid TEXT, abilityid TEXT, title TEXT, description TEXT
+);
+CREATE TABLE IF NOT EXISTS ploys (
+    killteamid TEXT NOT NULL, ploytype TEXT, ployid TEXT, ployname TEXT, CP TEXT, description TEXT
+);
+CREATE TABLE IF NOT EXISTS equipments (
+    killteamid TEXT NOT NULL, eqid TEXT, eqname TEXT, eqpts TEXT, eqtype TEXT, eqcategory TEXT, eqdescription TEXT
+);
+CREATE TABLE IF NOT EXISTS tacops (
+    killteamid TEXT NOT NULL, tacopid TEXT, archetype TEXT, title TEXT, description TEXT
+);
+CREATE INDEX IF NOT EXISTS teams_source ON teams (source);
+CREATE INDEX IF NOT EXISTS operatives_team ON operatives (killteamid);
+CREATE INDEX IF NOT EXISTS weapons_team ON weapons (killteamid);
+CREATE INDEX IF NOT EXISTS weapon_profiles_team ON weapon_profiles (killteamid, wepid);
+CREATE INDEX IF NOT EXISTS weapon_rules_name ON weapon_rules (rule_name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS weapon_rules_team ON weapon_rules (killteamid);
+CREATE INDEX IF NOT EXISTS abilities_team ON abilities (killteamid);
+CREATE INDEX IF NOT EXISTS ploys_team ON ploys (killteamid);
+CREATE INDEX IF NOT EXISTS equipments_team ON equipments (killteamid);
+CREATE INDEX IF NOT EXISTS tacops_team ON tacops (killteamid);
+"""
+
+# Every table with per-team rows, cleared before a team is re-indexed
+ROSTER_INDEX_TABLES = ["operatives", "weapons", "weapon_profiles", "weapon_rules",
+                       "abilities", "ploys", "equipments", "tacops"]
+
+WEAPON_RULE_QUALIFIER_PATTERN = re.compile(r"\([^)]*\)")  # "(DashOnly)"
+WEAPON_RULE_VARIABLE_PATTERN = re.compile(r"[xX][+\"]?")  # "x+", 'x"' in generic rule text
+WEAPON_RULE_NAME_PATTERN = re.compile(r"[^\d\"]*")  # Up to a number or inch mark: "Dev1", 'Rng 6"'
+
+def open_index(index_path=None):
+    connection = sqlite3.connect(index_path or config.ROSTER_INDEX)
+    connection.row_factory = sqlite3.Row
+    connection.executescript(ROSTER_INDEX_SCHEMA)
+    return connection
+
+def weapon_rule_name(rule):
+    """The rule's leading word(s), without parameter or qualifier: 'Dev1', 'Lethal 5+', 'Hvy (DashOnly)' -> 'Dev', 'Lethal', 'Hvy'"""
+    words = []
+    for word in WEAPON_RULE_QUALIFIER_PATTERN.sub(" ", rule).split():
+        if WEAPON_RULE_VARIABLE_PATTERN.fullmatch(word):
+            break
+        name = WEAPON_RULE_NAME_PATTERN.match(word).group()
+        if name:
+            words.append(name)
+        if name != word:
+            break
+    return " ".join(words) or rule
+
+def weapon_rules(special_rules):
+    """'Lethal 5+, Range 6"' -> [('Lethal 5+', 'Lethal'), ('Range 6"', 'Range')]"""
+    rules = []
+    for rule in (special_rules or "").split(","):
+        rule = rule.strip()
+        if rule and rule != "-":
+            rules.append((rule, weapon_rule_name(rule)))
+    return rules
+
+def without(item, *keys):
+    return {key: value for key, value in item.items() if key not in keys}
+
+def index_rows(data):
+    """The per-table rows for one cleaned and flattened roster."""
+    team = data.get("killteamid", "").upper()
+    rows = {table: [] for table in ROSTER_INDEX_TABLES}
+
+    for op in data.get("fireteams_operatives") or []:
+        rows["operatives"].append((
+            team, op.get("fireteamid"), op.get("opid"), op.get("opseq"), op.get("opname"),
+            op.get("M"), op.get("APL"), op.get("GA"), op.get("DF"), op.get("SV"), op.get("W"), op.get("keywords"),
+            json.dumps(without(op, "weapons", "abilities", "uniqueactions")),
+        ))
+    for weapon in data.get("operatives_weapons") or []:
+        rows["weapons"].append((
+            team, weapon.get("opid"), weapon.get("wepid"), weapon.get("wepseq"), weapon.get("wepname"),
+            weapon.get("weptype"), json.dumps(without(weapon, "profiles")),
+        ))
+        for profile in weapon.get("profiles") or []:
+            key = (team, weapon.get("opid"), weapon.get("wepid"))
+            rows["weapon_profiles"].append((
+                *key, weapon.get("wepname"), profile.get("profileid"), profile.get("name"),
+                profile.get("A"), profile.get("BS"), profile.get("D"), profile.get("SR"),
+            ))
+            for rule, rule_name in weapon_rules(profile.get("SR")):
+                rows["weapon_rules"].append((*key, profile.get("profileid"), rule, rule_name))
+    for ability in data.get("operatives_abilities") or []:
+        rows["abilities"].append((team, ability.get("opid"), ability.get("abilityid"),
+                                  ability.get("title"), ability.get("description")))
+    for ploy_type, ploys in (data.get("ploys") or {}).items():
+        for ploy in ploys:
+            rows["ploys"].append((team, ploy.get("ploytype", ploy_type), ploy.get("ployid"),
+                                  ploy.get("ployname"), ploy.get("CP"), ploy.get("description")))
+    for eq in data.get("equipments") or []:
+        rows["equipments"].append((team, eq.get("eqid"), eq.get("eqname"), eq.get("eqpts"),
+                                   eq.get("eqtype"), eq.get("eqcategory"), eq.get("eqdescription")))
+    for tacop in data.get("tacops") or []:
+        rows["tacops"].append((team, tacop.get("tacopid"), tacop.get("archetype"),
+                               tacop.get("title"), tacop.get("description")))
+    return rows
+
+def store_roster(connection, data, source, source_sha256, config_sha256):
+    """Replace one team's rows in a single transaction."""
+    team = data.get("killteamid", "").upper()
+    with connection:
+        stale = [row["killteamid"] for row in
+                 connection.execute("SELECT killteamid FROM teams WHERE source = ? OR killteamid = ?", (source, team))]
+        for stale_team in stale:
+            connection.execute("DELETE FROM teams WHERE killteamid = ?", (stale_team,))
+            for table in ROSTER_INDEX_TABLES:
+                connection.execute(f"DELETE FROM {table} WHERE killteamid = ?", (stale_team,))
+
+        connection.execute(
+            "INSERT INTO teams VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (team, data.get("killteamname"), data.get("factionid"), data.get("edition"),
+             source, source_sha256, config_sha256, time.time(), json.dumps(data)),
+        )
+        for table, table_rows in index_rows(data).items():
+            if table_rows:
+                placeholders = ", ".join("?" * len(table_rows[0]))
+                connection.executemany(f"INSERT INTO {table} VALUES ({placeholders})", table_rows)
+    return team
+
+def ingest(file_paths, index_path=None, force=False):
+    """
+    Add rosters to the index. A page whose content and the extraction config
+    are unchanged since it was last indexed is skipped.
+    """
+    index_path = index_path or config.ROSTER_INDEX
+    config_sha256 = config_fingerprint()
+    indexed = skipped = failed = 0
+    with closing(open_index(index_path)) as connection:
+        for file_path in file_paths:
+            try:
+                source_sha256 = file_sha256(file_path)
+            except OSError as e:
+                print(f"❌ {file_path}: {e}")
+                failed += 1
+                continue
+            known = connection.execute(
+                "SELECT killteamid FROM teams WHERE source = ? AND source_sha256 = ? AND config_sha256 = ?",
+                (file_path, source_sha256, config_sha256),
+            ).fetchone()
+            if known and not force:
+                skipped += 1
+                continue
+            try:
+                data = clean_and_flatten(file_path)
+            except ConversionError as e:
+                print(f"❌ {file_path}: {e}")
+                failed += 1
+                continue
+            team = store_roster(connection, data, file_path, source_sha256, config_sha256)
+            print(f"🗃️ Indexed {team} from {file_path}")
+            indexed += 1
+    print(f"🗃️ {index_path}: {indexed} indexed, {skipped} unchanged, {failed} failed")
+    return 1 if failed else 0
+
+def load_roster(connection, killteam_id):
+    """A roster from the index, ready for render_document (same as clean_and_flatten returns)."""
+    row = connection.execute("SELECT roster FROM teams WHERE killteamid = ?", (killteam_id.upper(),)).fetchone()
+    if row is None:
+        return None
+    return classify_strings(json.loads(row["roster"]))
+
+def indexed_team_ids(connection):
+    return [row["killteamid"] for row in connection.execute("SELECT killteamid FROM teams ORDER BY killteamid")]
+
+def render_from_index(index_path=None, killteam_ids=None, options=None):
+    """Write html/<KILLTEAMID>.html for indexed teams without touching the ktdash_* pages."""
+    from .render import output_path_for, render_document  # Imported here: ingest and queries never render
+    index_path = index_path or config.ROSTER_INDEX
+    os.makedirs(config.BASE_OUTPUT_PATH_HTML, exist_ok=True)
+    options = prepare_stylesheet(options or BuildOptions())
+    missing = 0
+    with closing(open_index(index_path)) as connection:
+        for killteam_id in killteam_ids or indexed_team_ids(connection):
+            data = load_roster(connection, killteam_id)
+            if data is None:
+                print(f"❌ {killteam_id} is not in {index_path}")
+                missing += 1
+                continue
+            output_file_html = output_path_for(data)
+            with open_sink(output_file_html) as sink:
+                render_document(data, sink, options)
+            update_gzip_companion(output_file_html, options.gzip)
+            print(f"✅ HTML viewer created: {output_file_html} (from {index_path})")
+    return 1 if missing else 0
+
+def find_weapons_with_rule(connection, rule_name):
+    """Every weapon profile with a special rule named rule_name (e.g. 'Lethal'), across all teams."""
+    return connection.execute(
+        """
+        SELECT r.killteamid, t.killteamname, p.wepname, p.name AS profile, p.A, p.BS, p.D, p.SR
+        FROM weapon_rules r
+        JOIN weapon_profiles p USING (killteamid, opid, wepid, profileid)
+        JOIN teams t USING (killteamid)
+        WHERE r.rule_name = ? COLLATE NOCASE
+        ORDER BY r.killteamid, p.wepname, p.profileid
+        """,
+        (rule_name,),
+    ).fetchall()
+
+def print_weapons_with_rule(index_path, rule_name):
+    index_path = index_path or config.ROSTER_INDEX
+    with closing(open_index(index_path)) as connection:
+        rows = find_weapons_with_rule(connection, rule_name)
+    for row in rows:
+        weapon = f"{row['wepname']} ({row['profile']})" if row["profile"] else row["wepname"]
+        print(f"{row['killteamid']:<8} {weapon:<40} A{row['A']} {row['BS']} D{row['D']}  {row['SR']}")
+    print(f"🔎 {len(rows)} weapon profile(s) with {rule_name} in {index_path}")
+    return 0
@@ -0,0 +1,25 @@
+"""Finding input pages: plain ktdash_* pages, and zip/tar exports told apart by name only (see archive.py)."""
+
+import os
+
+from . import config
+
+# === INPUTS ===
+
+def find_input_files(folder_path=None):
+    """All html/ktdash_* pages, sorted so batches run in a stable order."""
+    folder_path = folder_path or config.BASE_INPUT_PATH_HTML
+    return [
+        os.path.join(folder_path, filename)
+        for filename in sorted(os.listdir(folder_path))
+        if filename.startswith("ktdash_") and os.path.isfile(os.path.join(folder_path, filename))
+    ]
+
+def archive_kind(path):
+    """"zip", "tar" or None, going by the file name."""
+    name = os.fspath(path).lower()
+    if name.endswith(config.ZIP_SUFFIXES):
+        return "zip"
+    if name.endswith(tuple(config.TAR_SUFFIXES)):
+        return "tar"
+    return None
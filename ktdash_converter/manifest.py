@@ -0,0 +1,79 @@
+"""Build manifest: input and configuration hashes that let unchanged pages be skipped."""
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from . import config
+from .options import BuildOptions
+
+# === BUILD CACHE ===
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(config.EXTRACT_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+@lru_cache(maxsize=None)
+def code_fingerprint():
+    # Hashed once per process: the code that is running, even if the files change under a watcher
+    digest = hashlib.sha256()
+    for path in sorted(Path(__file__).parent.glob("*.py")):
+        digest.update(path.name.encode("utf-8"))
+        digest.update(file_sha256(path).encode("ascii"))
+    return digest.hexdigest()
+
+def config_fingerprint(options=None):
+    """
+    Hash of everything besides the input that shapes an output page: the
+    preprocessing/render configuration and the package's own source.
+    """
+    settings = {
+        "INPUT_KEYS_TO_IGNORE": config.INPUT_KEYS_TO_IGNORE,
+        "INPUT_FLATTEN_TARGETS": config.INPUT_FLATTEN_TARGETS,
+        "FLATTEN_DEDUPLICATION_KEYS": config.FLATTEN_DEDUPLICATION_KEYS,
+        "BLACKLIST_KEYS": sorted(config.BLACKLIST_KEYS),
+        "BLACKLIST_FIELDS": sorted(config.BLACKLIST_FIELDS),
+        "HORIZONTAL_TABLES": config.HORIZONTAL_TABLES,
+        "H1_HEADERS": config.H1_HEADERS,
+        "COLUMN_CONFIG": config.COLUMN_CONFIG,
+        "TITLE_OVERRIDES": config.TITLE_OVERRIDES,
+        "EMPHASIZE_FIELDS": config.EMPHASIZE_FIELDS,
+        "SKIP_RENDER_KEYS": sorted(config.SKIP_RENDER_KEYS),
+        "RENDER_ORDER": config.RENDER_ORDER,
+        "BASE_OUTPUT_PATH_HTML": config.BASE_OUTPUT_PATH_HTML,
+        "STYLESHEET_LINES": config.STYLESHEET_LINES,
+        "options": (options or BuildOptions()).fingerprint(),
+        "code": code_fingerprint(),
+    }
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()
+
+def load_manifest(manifest_path):
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("entries", {})
+    except (FileNotFoundError, json.JSONDecodeError, AttributeError):
+        return {}
+
+def save_manifest(manifest_path, entries):
+    # Write-then-rename so an interrupted run never leaves a half-written manifest
+    temp_path = f"{manifest_path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "entries": entries}, f, indent=4, sort_keys=True)
+    os.replace(temp_path, manifest_path)
+
+def cache_status(entry, input_sha256, config_sha256):
+    """Return None if the recorded output is still valid, else why it must be rebuilt."""
+    if entry is None:
+        return "new"
+    if entry.get("input_sha256") != input_sha256:
+        return "input changed"
+    if entry.get("config_sha256") != config_sha256:
+        return "config changed"
+    if not entry.get("output") or not os.path.isfile(entry["output"]):
+        return "output missing"
+    return None
@@ -0,0 +1,27 @@
+"""--minify: whitespace removal for the converter's own CSS and fixed markup (never roster text)."""
+
+import re
+
+# === MINIFY ===
+
+CSS_STRING_PATTERN = re.compile(r"""("[^"]*"|'[^']*')""")
+CSS_COMMENT_PATTERN = re.compile(r"/\*.*?\*/", re.DOTALL)
+CSS_SPACE_PATTERN = re.compile(r"\s+")
+CSS_PUNCTUATION_PATTERN = re.compile(r"\s*([{}:;,>])\s*")
+MARKUP_GAP_PATTERN = re.compile(r">\s+<")
+
+def minify_css(css):
+    """Drop comments and insignificant whitespace; quoted strings ('Segoe UI') are kept as written."""
+    parts = CSS_STRING_PATTERN.split(CSS_COMMENT_PATTERN.sub("", css))
+    for i in range(0, len(parts), 2):  # Even parts are outside quotes
+        text = CSS_SPACE_PATTERN.sub(" ", parts[i])
+        parts[i] = CSS_PUNCTUATION_PATTERN.sub(r"\1", text).replace(";}", "}")
+    return "".join(parts).strip()
+
+def minify_markup(markup):
+    """
+    Collapse the indentation of a fixed block of the converter's own markup,
+    such as the footer. Whitespace between tags is dropped, so only use it
+    where those tags are block elements.
+    """
+    return MARKUP_GAP_PATTERN.sub("><", CSS_SPACE_PATTERN.sub(" ", markup)).strip()
@@ -0,0 +1,101 @@
+"""Per-run build options and configuration overrides."""
+
+import json
+import sys
+from dataclasses import dataclass
+
+from . import config
+from .config import ConfigError
+
+# === BUILD OPTIONS ===
+
+@dataclass(frozen=True)
+class BuildOptions:
+    """
+    Per-run settings handed to every worker (must stay picklable). Fields left
+    None take their config default when the options are created, after overrides.
+    """
+    debug: bool = None  # None: config.DEBUG_DUMP_JSON
+    css: str = None  # None: config.CSS_MODE
+    stylesheet_href: str = None  # Set by prepare_stylesheet() in "external" mode
+    profile: bool = False
+    profile_dir: str = None  # None: config.PROFILE_DIR
+    compact: bool = False  # Interned strings and slotted records (same output, less memory)
+    minify: bool = False  # Pages without the separating newlines and indentation, minified CSS
+    gzip: int = 0  # Level of the .gz companions written next to the pages; 0 writes none
+    overrides: tuple = ()  # (NAME, value) config overrides, re-applied in spawned worker processes
+
+    def __post_init__(self):
+        for field, setting in (("debug", "DEBUG_DUMP_JSON"), ("css", "CSS_MODE"), ("profile_dir", "PROFILE_DIR")):
+            if getattr(self, field) is None:
+                object.__setattr__(self, field, getattr(config, setting))
+
+    def fingerprint(self):
+        # Everything that changes the rendered output (debug dumps, profiling and gzip companions do not)
+        fingerprint = {"css": self.css, "stylesheet_href": self.stylesheet_href}
+        if self.minify:
+            fingerprint["minify"] = True  # Only when set, so existing manifests stay valid
+        return fingerprint
+
+# === CONFIG OVERRIDES ===
+
+_APPLIED_OVERRIDES = ()
+
+def parse_override(assignment):
+    """'NAME=VALUE' -> (NAME, value); VALUE is JSON, or else taken as a plain string."""
+    name, separator, text = assignment.partition("=")
+    if not separator:
+        raise ConfigError(f"Override {assignment!r} is not NAME=VALUE")
+    try:
+        value = json.loads(text)
+    except json.JSONDecodeError:
+        value = text
+    return name.strip(), value
+
+def load_overrides(path):
+    """Overrides from a JSON file holding one object of {NAME: value}."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise ConfigError(f"Cannot read config overrides from {path}: {e}")
+    if not isinstance(overrides, dict):
+        raise ConfigError(f"{path} must hold a JSON object of {{NAME: value}}")
+    return list(overrides.items())
+
+def coerce_like(current, value):
+    """Give a JSON value the container types of the setting it replaces (tuples, sets, bytes)."""
+    if isinstance(current, bytes) and isinstance(value, str):
+        return value.encode("utf-8")
+    if isinstance(current, dict) and isinstance(value, dict):
+        sample = next(iter(current.values()), None)
+        return {key: coerce_like(current.get(key, sample), item) for key, item in value.items()}
+    if isinstance(current, (list, tuple, set)) and isinstance(value, list):
+        sample = next(iter(current), None)
+        items = [coerce_like(sample, item) for item in value]
+        return items if isinstance(current, list) else type(current)(items)
+    return value
+
+def apply_overrides(overrides):
+    """
+    Replace configuration constants, e.g. [("BASE_OUTPUT_PATH_HTML", "out/")].
+    Render plans are recompiled and fragments re-rendered on next use. Applying the
+    same overrides again is a no-op.
+    """
+    global _APPLIED_OVERRIDES
+    overrides = tuple(overrides)
+    if overrides == _APPLIED_OVERRIDES:
+        return
+    for name, value in overrides:
+        if not (name.isupper() and hasattr(config, name)):
+            raise ConfigError(f"Unknown setting {name!r}")
+        setattr(config, name, coerce_like(getattr(config, name), value))
+    _APPLIED_OVERRIDES = overrides
+
+    # Only plans and fragments made before the overrides are stale; importing them here would pull in the renderer
+    plans = sys.modules.get(f"{__package__}.plans")
+    if plans is not None:
+        plans.reset_render_plans()
+    render = sys.modules.get(f"{__package__}.render")
+    if render is not None:
+        render.FRAGMENT_CACHE.clear()
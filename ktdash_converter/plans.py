@@ -0,0 +1,189 @@
+"""Render plans: the column configuration compiled once into per-table cell strategies."""
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from functools import partial
+from html import escape
+
+from . import config
+from . import profiler
+from . import render
+from .config import ConfigError
+from .records import MAPPING_TYPES
+from .text import contains_html, escape_cell, render_subtable
+
+# === RENDER PLANS ===
+
+@dataclass(frozen=True, slots=True)
+class ColumnPlan:
+    field: str
+    cell: object      # Cell strategy: cell(value, item) -> html
+    open_tag: str     # Prebuilt "<td class='...'>"
+
+
+@dataclass(frozen=True, slots=True)
+class RenderPlan:
+    key: str
+    header_html: str  # Prebuilt "<tr><th>...</th></tr>"
+    columns: tuple
+    reads: tuple      # Every item field the cells look at
+    signature: str    # Stable hash of the above, part of fragment cache keys
+
+
+@dataclass(frozen=True, slots=True)
+class RenderPlans:
+    tables: dict       # COLUMN_CONFIG key -> RenderPlan, with render_table cell rules
+    weapons: RenderPlan
+    profiles: RenderPlan
+    stats_header: str  # HORIZONTAL_TABLES["fireteams_operatives"] header cells
+    stats_fields: tuple
+
+
+_RENDER_PLANS = None
+
+CSS_CLASS_PATTERN = re.compile(r"-?[_a-zA-Z][_a-zA-Z0-9-]*")
+
+def is_list_of_dicts(val):
+    return isinstance(val, list) and all(isinstance(sub, MAPPING_TYPES) for sub in val)
+
+# Cell strategies
+
+def cell_auto(val, item):
+    if is_list_of_dicts(val):
+        return render_subtable(val)
+    if isinstance(val, str) and contains_html(val):
+        return val
+    return escape_cell(val)
+
+def cell_emphasis(main, add, val, item):
+    if is_list_of_dicts(val):
+        return render_subtable(val)
+    if isinstance(val, str) and contains_html(val):
+        return val
+    if main in item and add in item:
+        return f"{escape_cell(item[main])} <span class='emphasis'>[{escape_cell(item[add])}]</span>"
+    return escape_cell(val)
+
+def cell_text(val, item):
+    if not isinstance(val, str):
+        val = str(val)
+    return val if contains_html(val) else escape_cell(val)
+
+def cell_weapon(val, item):
+    if is_list_of_dicts(val):
+        return render_subtable(val)
+    return cell_text(val, item)
+
+def cell_profiles(val, item):
+    return render.render_profiles_table(val)
+
+def header_row(labels, classes):
+    return "<tr>" + "".join(
+        f"<th class='{escape(cls)}'>{escape(label)}</th>" if cls else f"<th>{escape(label)}</th>"
+        for label, cls in zip(labels, classes)
+    ) + "</tr>"
+
+def strategy_name(cell):
+    if isinstance(cell, partial):
+        return f"{cell.func.__name__}{cell.args}"
+    return cell.__name__
+
+def compile_plan(key, columns, cell_for):
+    """columns: (field, label, css class) triples; cell_for(field) picks the strategy."""
+    header_html = header_row([label for _, label, _ in columns], [cls for _, _, cls in columns])
+    column_plans = tuple(
+        ColumnPlan(field, cell_for(field), f"<td class='{escape(cls)}'>" if cls else "<td>")
+        for field, _, cls in columns
+    )
+    reads = []
+    for c in column_plans:
+        reads.append(c.field)
+        if isinstance(c.cell, partial):
+            reads.extend(arg for arg in c.cell.args if isinstance(arg, str))
+    reads = tuple(dict.fromkeys(reads))
+    signature = json.dumps([key, header_html, [(c.field, c.open_tag, strategy_name(c.cell)) for c in column_plans]])
+    return RenderPlan(
+        key=key,
+        header_html=header_html,
+        columns=column_plans,
+        reads=reads,
+        signature=hashlib.sha256(signature.encode("utf-8")).hexdigest(),
+    )
+
+def table_cell_for(key):
+    emphasize_main, emphasize_add = config.EMPHASIZE_FIELDS.get(key, (None, None))
+
+    def cell_for(field):
+        if field == emphasize_main:
+            return partial(cell_emphasis, emphasize_main, emphasize_add)
+        return cell_auto
+    return cell_for
+
+def normalized_columns(key):
+    return [(field, label, rest[0] if rest else "") for field, label, *rest in config.COLUMN_CONFIG.get(key, [])]
+
+def validate_config():
+    """Check the loaded render configuration up front instead of failing mid-render."""
+    problems = []
+
+    for key, columns in config.COLUMN_CONFIG.items():
+        fields = set()
+        for col in columns:
+            if not (isinstance(col, tuple) and len(col) in (2, 3) and all(isinstance(part, str) for part in col)):
+                problems.append(f"COLUMN_CONFIG[{key!r}]: column {col!r} is not (field, label[, class])")
+                continue
+            if col[0] in fields:
+                problems.append(f"COLUMN_CONFIG[{key!r}]: field {col[0]!r} listed twice")
+            fields.add(col[0])
+            if len(col) == 3 and col[2] and not CSS_CLASS_PATTERN.fullmatch(col[2]):
+                problems.append(f"COLUMN_CONFIG[{key!r}]: {col[2]!r} is not a CSS class name")
+
+    for key, fields in config.EMPHASIZE_FIELDS.items():
+        if not (isinstance(fields, tuple) and len(fields) == 2):
+            problems.append(f"EMPHASIZE_FIELDS[{key!r}] must be a (main, additional) pair")
+        elif key in config.COLUMN_CONFIG and fields[0] not in [col[0] for col in config.COLUMN_CONFIG[key]]:
+            problems.append(f"EMPHASIZE_FIELDS[{key!r}]: {fields[0]!r} is not a column of COLUMN_CONFIG[{key!r}]")
+
+    for key, fields in config.HORIZONTAL_TABLES.items():
+        if not all(isinstance(col, tuple) and len(col) == 2 for col in fields):
+            problems.append(f"HORIZONTAL_TABLES[{key!r}] must hold (field, label) pairs")
+
+    if problems:
+        raise ConfigError("Invalid render configuration:\n  " + "\n  ".join(problems))
+
+def compile_render_plans():
+    validate_config()
+
+    stats = config.HORIZONTAL_TABLES.get("fireteams_operatives", [])
+    return RenderPlans(
+        tables={key: compile_plan(key, normalized_columns(key), table_cell_for(key)) for key in config.COLUMN_CONFIG},
+        weapons=compile_plan(
+            "weapons", normalized_columns("weapons"),
+            lambda field: cell_profiles if field == "profiles" else cell_weapon,
+        ),
+        profiles=compile_plan("profiles", normalized_columns("profiles"), lambda field: cell_text),
+        stats_header="".join(f"<th>{escape(label)}</th>" for _, label in stats),
+        stats_fields=tuple(field for field, _ in stats),
+    )
+
+def get_render_plans():
+    """Render plans are compiled (and the config validated) once per process."""
+    global _RENDER_PLANS
+    if _RENDER_PLANS is None:
+        _RENDER_PLANS = compile_render_plans()
+    return _RENDER_PLANS
+
+def reset_render_plans():
+    """Drop the compiled plans, e.g. after changing the configuration at runtime."""
+    global _RENDER_PLANS
+    _RENDER_PLANS = None
+
+def render_rows(plan, items):
+    profiler.PROFILER.count("rows_rendered", len(items))
+    profiler.PROFILER.count("cells_rendered", len(items) * len(plan.columns))
+    for item in items:
+        yield "<tr>" + "".join(
+            f"{col.open_tag}{col.cell(item.get(col.field, ''), item)}</td>" for col in plan.columns
+        ) + "</tr>"
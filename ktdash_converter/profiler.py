@@ -0,0 +1,108 @@
+"""--profile: per-stage wall time, peak memory and counters."""
+
+import os
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+
+# === PROFILING ===
+
+class Profiler:
+    """
+    Records wall time and tracemalloc peak memory per stage, plus counters.
+    Stages nest; each is reported under its path, e.g. "render/ploys".
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = Counter()
+        self.path = []
+        self.peaks = []
+
+    @contextmanager
+    def stage(self, name):
+        current, peak = tracemalloc.get_traced_memory()
+        if self.peaks:
+            # Keep the enclosing stage's peak before resetting it for this one
+            self.peaks[-1] = max(self.peaks[-1], peak)
+        tracemalloc.reset_peak()
+        self.path.append(name)
+        self.peaks.append(current)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall_ms = (time.perf_counter() - start) * 1000
+            peak = max(self.peaks.pop(), tracemalloc.get_traced_memory()[1])
+            if self.peaks:
+                self.peaks[-1] = max(self.peaks[-1], peak)
+            stage = self.stages.setdefault("/".join(self.path), {
+                "calls": 0, "wall_ms": 0.0, "peak_bytes": 0, "peak_delta_bytes": 0,
+            })
+            self.path.pop()
+            stage["calls"] += 1
+            stage["wall_ms"] += wall_ms
+            stage["peak_bytes"] = max(stage["peak_bytes"], peak)
+            stage["peak_delta_bytes"] = max(stage["peak_delta_bytes"], peak - current)
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def report(self):
+        return {"stages": self.stages, "counters": dict(self.counters)}
+
+
+class NullProfiler:
+    """Stand-in when profiling is off: stages and counters cost next to nothing."""
+    _stage = nullcontext()
+
+    def stage(self, name):
+        return self._stage
+
+    def count(self, name, n=1):
+        pass
+
+
+PROFILER = NullProfiler()
+
+@contextmanager
+def profiling(enabled=True):
+    """Activate a fresh Profiler (and tracemalloc) for the duration of the block."""
+    global PROFILER
+    if not enabled:
+        yield None
+        return
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    previous, PROFILER = PROFILER, Profiler()
+    try:
+        yield PROFILER
+    finally:
+        PROFILER = previous
+        if started_tracing:
+            tracemalloc.stop()
+
+def aggregate_profiles(reports):
+    """Batch aggregate: stage totals, counter sums and per-file wall times."""
+    stages = {}
+    counters = Counter()
+    for report in reports:
+        for name, stage in report["stages"].items():
+            total = stages.setdefault(name, {"calls": 0, "wall_ms": 0.0, "peak_bytes": 0})
+            total["calls"] += stage["calls"]
+            total["wall_ms"] += stage["wall_ms"]
+            total["peak_bytes"] = max(total["peak_bytes"], stage["peak_bytes"])
+        counters.update(report["counters"])
+    return {
+        "files": len(reports),
+        "stages": stages,
+        "counters": dict(counters),
+        "per_file_ms": {report["input"]: report["total_ms"] for report in reports},
+    }
+
+def profile_report_path(profile_dir, input_path_html):
+    return os.path.join(profile_dir, f"{Path(input_path_html).stem}.profile.json")
@@ -0,0 +1,86 @@
+"""Compact slotted records for operatives, weapons and profiles (see extract.CompactLoader)."""
+
+import keyword
+from functools import lru_cache
+
+
+# === COMPACT RECORDS ===
+
+class Record:
+    """
+    Roster object stored in one slot per field instead of a dict. Offers the
+    access the pipeline and renderers use: item[field], get, in, iteration,
+    items(), and assignment to existing fields (classify_strings).
+    """
+    __slots__ = ()
+    FIELDS = ()
+    FIELD_SET = frozenset()
+
+    def __init__(self, values):
+        for field, value in zip(self.FIELDS, values):
+            setattr(self, field, value)
+
+    def __getitem__(self, key):
+        if key not in self.FIELD_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.FIELD_SET:
+            raise KeyError(f"{type(self).__name__} has no field {key!r}")
+        setattr(self, key, value)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.FIELD_SET else default
+
+    def __contains__(self, key):
+        return key in self.FIELD_SET
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self):
+        return len(self.FIELDS)
+
+    def keys(self):
+        return self.FIELDS
+
+    def values(self):
+        return [getattr(self, field) for field in self.FIELDS]
+
+    def items(self):
+        return [(field, getattr(self, field)) for field in self.FIELDS]
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+# What counts as a roster object / container, with compact records in play
+MAPPING_TYPES = (dict, Record)
+CONTAINER_TYPES = (dict, Record, list)
+
+# Marker field -> record type name; only objects with a marker become records
+RECORD_KINDS = {
+    "opname": "Operative",
+    "wepname": "Weapon",
+    "profileid": "WeaponProfile",
+    "abilityid": "Ability",
+    "eqid": "Equipment",
+    "ployid": "Ploy",
+    "tacopid": "TacOp",
+}
+
+@lru_cache(maxsize=None)
+def record_type(kind, fields):
+    """Record class for one exact field layout, or None if a field cannot be a slot."""
+    if not all(f.isidentifier() and not keyword.iskeyword(f) and not hasattr(Record, f) for f in fields):
+        return None
+    return type(kind, (Record,), {"__slots__": fields, "FIELDS": fields, "FIELD_SET": frozenset(fields)})
+
+def record_to_dict(obj):
+    """json.dump(s) `default` for compact rosters."""
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,309 @@
+"""Rendering a cleaned and flattened roster into the HTML page, with the fragment cache."""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from html import escape
+
+from . import config
+from . import plans
+from . import profiler
+from .minify import minify_markup
+from .options import BuildOptions
+from .records import CONTAINER_TYPES, MAPPING_TYPES, record_to_dict
+from .sinks import PartList
+from .stylesheet import stylesheet_head
+from .text import contains_html, escape_cell, render_keywords, should_skip_key, title_for
+
+# === FRAGMENT CACHE ===
+
+class FragmentCache:
+    """
+    Bounded LRU cache of rendered HTML fragments, shared by every roster
+    rendered in this process. Keys are (section, item data, render plan), so
+    byte-identical sections such as the universal equipment are rendered once.
+    Only the fields the plan reads go into the key: ids like killteamid or opid
+    differ between rosters but never reach the page.
+    """
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries  # None: config.FRAGMENT_CACHE_SIZE, read at use
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()  # The render server shares one cache between threads
+
+    @property
+    def limit(self):
+        return config.FRAGMENT_CACHE_SIZE if self.max_entries is None else self.max_entries
+
+    @property
+    def enabled(self):
+        return self.limit > 0
+
+    @staticmethod
+    def key_for(section, items, plan):
+        reads = plan.reads
+        rows = tuple(
+            tuple(fragment_key_value(item[field]) if field in item else ABSENT for field in reads)
+            for item in items
+        )
+        return section, plan.signature, rows
+
+    def get_or_render(self, section, items, plan, render):
+        if not self.enabled:
+            return render()
+        key = self.key_for(section, items, plan)
+        with self.lock:
+            fragment = self.entries.get(key)
+            if fragment is not None:
+                self.hits += 1
+                self.entries.move_to_end(key)
+            else:
+                self.misses += 1
+        if fragment is not None:
+            profiler.PROFILER.count("fragment_cache_hits")
+            return fragment
+
+        profiler.PROFILER.count("fragment_cache_misses")
+        fragment = render()
+        with self.lock:
+            self.entries[key] = fragment
+            if len(self.entries) > self.limit:
+                self.entries.popitem(last=False)
+        return fragment
+
+    def clear(self):
+        """Drop every fragment, e.g. after the configuration changed (titles, blacklisted fields)."""
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries), "max_entries": self.limit}
+
+
+ABSENT = object()  # Marks a field the item does not have (presence matters for emphasis)
+
+def fragment_key_value(value):
+    """Hashable stand-in for a cell value; scalars keep their type so 1 and True differ."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, CONTAINER_TYPES):
+        return json.dumps(value, sort_keys=True, default=record_to_dict)
+    return type(value).__name__, value
+
+
+FRAGMENT_CACHE = FragmentCache()
+
+# === RENDERING ===
+
+def render_table(title, items, add_header=True, sink=None):
+    """Returns the table as a string, or streams it into `sink` (and returns None)."""
+    if not items:
+        empty = f"<h2>{escape(title_for(title))}</h2><p><em>No data</em></p>"
+        if sink is None:
+            return empty
+        sink.add(empty)
+        return None
+
+    key = title.lower()
+    plan = plans.get_render_plans().tables.get(key)
+    if plan is None:
+        # Not configured: columns come from the data itself
+        headers = sorted({field for item in items for field in item if field not in config.BLACKLIST_FIELDS})
+        plan = plans.compile_plan(key, [(h, h, "") for h in headers], plans.table_cell_for(key))
+
+    if FRAGMENT_CACHE.enabled:
+        # Whole table as one part, joined like the sink would, so identical to streaming its rows
+        separator = "\n" if sink is None else sink.separator
+        table_html = FRAGMENT_CACHE.get_or_render(
+            ("table", title, add_header, separator), items, plan,
+            lambda: emit_table(title, items, add_header, plan, PartList(separator)).joined(),
+        )
+        if sink is None:
+            return table_html
+        sink.add(table_html)
+        return None
+
+    if sink is None:
+        return emit_table(title, items, add_header, plan, PartList()).joined()
+    emit_table(title, items, add_header, plan, sink)
+    return None
+
+def emit_table(title, items, add_header, plan, out):
+    if add_header:
+        out.add(f"<h2>{escape(title_for(title))}</h2>")
+    out.add("<table>")
+    out.add(plan.header_html)
+    out.extend(plans.render_rows(plan, items))
+    out.add("</table>")
+    return out
+
+def render_value(key, value):
+    pretty_title = title_for(key)
+
+    if isinstance(value, list):
+        if not value:
+            return f"<h2>{escape(pretty_title)}</h2><p><em>No data</em></p>"
+        elif all(isinstance(i, MAPPING_TYPES) for i in value):
+            return render_table(key, value)
+    elif isinstance(value, MAPPING_TYPES):
+        return "\n".join(
+            render_value(f"{key} - {k}", v)
+            for k, v in value.items()
+            if not should_skip_key(k)
+        )
+    elif isinstance(value, str) and contains_html(value):
+        return f"<h2>{escape(pretty_title)}</h2><div>{value}</div>"
+    else:
+        return f"<h2>{escape(pretty_title)}</h2><pre>{escape_cell(value)}</pre>"
+
+def render_stats_table(op, source_key="fireteams_operatives"):
+    if source_key != "fireteams_operatives":
+        fields = config.HORIZONTAL_TABLES.get(source_key)
+        if not fields:
+            return ""
+        headers = "".join(f"<th>{escape(label)}</th>" for _, label in fields)
+        values = "".join(f"<td>{escape_cell(op.get(field, ''))}</td>" for field, _ in fields)
+        return f"<table><tr>{headers}</tr><tr>{values}</tr></table>"
+
+    render_plans = plans.get_render_plans()
+    if not render_plans.stats_fields:
+        return ""
+    values = "".join(f"<td>{escape_cell(op.get(field, ''))}</td>" for field in render_plans.stats_fields)
+    return f"<table><tr>{render_plans.stats_header}</tr><tr>{values}</tr></table>"
+
+def render_weapon_block(weapons):
+    if not weapons:
+        return ""
+
+    plan = plans.get_render_plans().weapons
+    html = ["<h3>Weapons</h3>", "<table>", plan.header_html]
+    html.extend(plans.render_rows(plan, weapons))
+    html.append("</table>")
+    return "".join(html)
+
+def render_profiles_table(profiles):
+    plan = plans.get_render_plans().profiles
+    if not profiles or not plan.columns:
+        return "<em>No profiles</em>"
+
+    return FRAGMENT_CACHE.get_or_render(
+        ("profiles",), profiles, plan,
+        lambda: "".join(["<table>", plan.header_html, *plans.render_rows(plan, profiles), "</table>"]),
+    )
+
+
+
+def render_operatives(operatives, sink=None):
+    """Returns the operative sections as a string, or streams them into `sink`."""
+    out = PartList() if sink is None else sink
+    for op in operatives:
+        out.add(f"<h2>{escape_cell(op.get('opname', 'Unnamed Operative'))}</h2>")
+        out.add(render_stats_table(op))
+        out.add(render_weapon_block(op.get("weapons", [])))
+        if op.get("abilities"):
+            out.add("<h3>Abilities</h3>")
+            render_table("abilities", op["abilities"], add_header=False, sink=out)
+
+        if op.get("keywords"):
+            out.add(render_keywords(op["keywords"]))
+
+        if op.get("uniqueactions"):
+            out.add("<h3>Unique Actions</h3>")
+            render_table("uniqueactions", op["uniqueactions"], add_header=False, sink=out)
+    return out.joined() if sink is None else None
+
+# === LOAD AND PREP DATA ===
+def render_section(out, key, value, killteam_name, current_killteam_id):
+    """Render one RENDER_ORDER entry of the roster into `out`."""
+    # Insert a custom <h1> header if this key has one
+    if key in config.H1_HEADERS:
+        out.add(f"<h1>{escape(config.H1_HEADERS[key])}</h1>")
+
+    if key == "fireteams_operatives":
+        out.add(f"<h1>{title_for(key)}</h1>")
+        render_operatives(value, sink=out)
+
+    elif key == "equipments" and isinstance(value, list):
+        # Dynamically split equipment by killteamid
+        team_equip = [e for e in value if e.get("killteamid", "").upper() == current_killteam_id]
+        universal_equip = [e for e in value if e.get("killteamid", "").upper() == "ALL"]
+
+        if team_equip:
+            out.add(f"<h2>{killteam_name} Equipment</h2>")
+            render_table("equipments", team_equip, add_header=False, sink=out)  # ✅ Suppress auto <h2>
+
+        if universal_equip:
+            out.add("<h2>Universal Equipment</h2>")
+            render_table("equipments", universal_equip, add_header=False, sink=out)  # ✅ Suppress auto <h2>
+
+
+    elif isinstance(value, list):
+        render_table(key, value, sink=out)
+
+    elif isinstance(value, MAPPING_TYPES):
+        for subkey, subval in value.items():
+            if isinstance(subval, list):
+                render_table(subkey, subval, sink=out)
+            else:
+                out.add(render_value(f"{key} - {subkey}", subval))
+
+    else:
+        if not should_skip_key(key):
+            out.add(render_value(key, value))
+
+FOOTER_HTML = """
+    <footer class="credits">
+        <h2>Credits</h2>
+        <p>This document is based on data from <a href="https://ktdash.app/fa/HBR/kt/GK24" target="_blank">KT Dash – Grey Knights Kill Team</a>.</p> 
+        <p>Recompiled and structured by <a href="https://cults3d.com/en/users/s070808/3d-models" target="_blank">s070808 @ Cults3d</a></p>
+    </footer>
+    """
+
+def render_document(data, sink=None, options=None):
+    """
+    Render a cleaned and flattened roster dict into a complete HTML page.
+    Returns the page as a string, or streams it into `sink` (and returns None).
+    """
+    options = options or BuildOptions()
+    out = PartList() if sink is None else sink
+    killteam_name = data.get("killteamname", "Unnamed Kill Team")
+    current_killteam_id = data.get("killteamid", "").upper()
+
+    # === HTML HEADER ===
+
+    head = [
+        "<!DOCTYPE html>",
+        "<html>",
+        "<head>",
+        "  <meta charset='UTF-8'>",
+        f"  <title>{escape(killteam_name)} - Kill Team Overview (Homebrew)</title>",
+        *stylesheet_head(options),
+        "</head>",
+        "<body>",
+        f"  <h1>{escape(killteam_name)} - Kill Team Overview (Homebrew)</h1>"
+    ]
+    if options.minify:
+        # Parts are only ever split between block elements, so the separating newlines can go
+        out.separator = ""
+        head = [line.strip() for line in head]
+    out.extend(head)
+
+    # === MAIN RENDER LOOP ===
+
+    for key in config.RENDER_ORDER:
+        value = data.get(key)
+        if not value:
+            continue
+        with profiler.PROFILER.stage(key):
+            render_section(out, key, value, killteam_name, current_killteam_id)
+
+    # === FINALIZE OUTPUT ===
+    out.add(minify_markup(FOOTER_HTML) if options.minify else FOOTER_HTML)
+    out.add("</body></html>")
+    return out.joined() if sink is None else None
+
+def output_path_for(data):
+    return os.path.join(config.BASE_OUTPUT_PATH_HTML, data.get("killteamid", "").upper() + ".html")
@@ -0,0 +1,226 @@
+"""--serve: a local HTTP server that renders pages on demand."""
+
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, replace
+from email.utils import formatdate, parsedate_to_datetime
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from . import config
+from .extract import ConversionError, clean_and_flatten, peek_killteam_id
+from .manifest import config_fingerprint, file_sha256
+from .options import BuildOptions
+from .plans import get_render_plans
+from .render import render_document
+from .sinks import open_sink
+from .stylesheet import stylesheet_filename, stylesheet_text
+from .watch import snapshot_inputs
+
+# === RENDER SERVER ===
+
+@dataclass(frozen=True)
+class RenderedPage:
+    body: bytes
+    etag: str
+    last_modified: float  # Input mtime, seconds since the epoch
+
+
+class RenderService:
+    """
+    Renders /<killteamid>.html on demand from the matching ktdash_* input.
+    Pages are kept in an LRU keyed by input content hash, and concurrent
+    requests for the same roster wait for one render (single-flight).
+    """
+
+    def __init__(self, folder_path=None, options=None, max_pages=None):
+        options = options or BuildOptions()
+        if options.css == "external":
+            # Served from memory, see stylesheet()
+            options = replace(options, stylesheet_href=stylesheet_filename(options.minify))
+        self.folder_path = folder_path or config.BASE_INPUT_PATH_HTML
+        self.options = options
+        self.max_pages = config.SERVE_CACHE_SIZE if max_pages is None else max_pages
+        self.config_sha256 = config_fingerprint(options)
+        self.pages = OrderedDict()
+        self.inflight = {}
+        self.inputs = {}  # path -> ((mtime_ns, size), killteamid, sha256)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def refresh_inputs(self):
+        """Re-read ids and hashes only for pages whose (mtime, size) changed."""
+        snapshot = snapshot_inputs(self.folder_path)
+        inputs = {}
+        for file_path, signature in snapshot.items():
+            known = self.inputs.get(file_path)
+            if known and known[0] == signature:
+                inputs[file_path] = known
+                continue
+            try:
+                inputs[file_path] = (signature, peek_killteam_id(file_path), file_sha256(file_path))
+            except (OSError, ConversionError) as e:
+                print(f"⚠️ Skipping {file_path}: {e}")
+        with self.lock:
+            self.inputs = inputs
+        return inputs
+
+    def find_input(self, killteam_id):
+        for file_path, (signature, input_id, input_sha256) in sorted(self.refresh_inputs().items()):
+            if input_id == killteam_id.upper():
+                return file_path, signature, input_sha256
+        return None
+
+    def team_ids(self):
+        return sorted(input_id for _, input_id, _ in self.refresh_inputs().values() if input_id)
+
+    def etag_for(self, input_sha256):
+        """Depends only on the input and config hashes, so it is known before rendering."""
+        return f'"{input_sha256[:16]}-{self.config_sha256[:8]}"'
+
+    def render(self, file_path, signature, input_sha256):
+        data = clean_and_flatten(file_path, compact=self.options.compact)
+        with io.StringIO() as buffer:
+            with open_sink(buffer) as sink:
+                render_document(data, sink, self.options)
+            body = buffer.getvalue().encode("utf-8")
+        return RenderedPage(body, self.etag_for(input_sha256), signature[0] / 1e9)
+
+    def page(self, killteam_id, found=None):
+        """The rendered page for a killteamid (or an already looked up input), or None if there is no such input."""
+        found = found or self.find_input(killteam_id)
+        if found is None:
+            return None
+        file_path, signature, input_sha256 = found
+        key = input_sha256
+
+        with self.lock:
+            page = self.pages.get(key)
+            if page is not None:
+                self.hits += 1
+                self.pages.move_to_end(key)
+                return page
+            future = self.inflight.get(key)
+            owner = future is None
+            if owner:
+                self.misses += 1
+                future = self.inflight[key] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            page = self.render(file_path, signature, input_sha256)
+            with self.lock:
+                self.pages[key] = page
+                while len(self.pages) > self.max_pages:
+                    self.pages.popitem(last=False)
+            future.set_result(page)
+            return page
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                del self.inflight[key]
+
+    def stylesheet(self):
+        return stylesheet_text(self.options.minify).encode("utf-8")
+
+
+def not_modified(headers, etag, last_modified):
+    """Conditional GET: If-None-Match wins; If-Modified-Since only counts without it."""
+    if_none_match = headers.get("If-None-Match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+    if_modified_since = headers.get("If-Modified-Since")
+    if if_modified_since:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def make_request_handler(service):
+    class RenderRequestHandler(BaseHTTPRequestHandler):
+        server_version = "ktdash-render"
+
+        def do_GET(self):
+            path = unquote(urlsplit(self.path).path).strip("/")
+            if path in ("", "index.html"):
+                self.send_index()
+            elif service.options.stylesheet_href and path == service.options.stylesheet_href:
+                self.send_body(service.stylesheet(), "text/css; charset=utf-8",
+                               {"Cache-Control": "public, max-age=31536000, immutable"})
+            elif path.endswith(".html") and "/" not in path:
+                self.send_roster(path[:-len(".html")])
+            else:
+                self.send_error(404, "Not found")
+
+        def send_roster(self, killteam_id):
+            found = service.find_input(killteam_id)
+            if found is None:
+                self.send_error(404, f"No ktdash_* input for {killteam_id}")
+                return
+            # Validators come from the input alone: a 304 never needs a render, even after LRU eviction
+            _, signature, input_sha256 = found
+            etag, last_modified = service.etag_for(input_sha256), signature[0] / 1e9
+            headers = {
+                "ETag": etag,
+                "Last-Modified": formatdate(last_modified, usegmt=True),
+                "Cache-Control": "no-cache",
+            }
+            if not_modified(self.headers, etag, last_modified):
+                self.send_response(304)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                return
+            try:
+                page = service.page(killteam_id, found)
+            except ConversionError as e:
+                self.send_error(500, f"Cannot convert {killteam_id}: {e}")
+                return
+            self.send_body(page.body, "text/html; charset=utf-8", headers)
+
+        def send_index(self):
+            links = "\n".join(
+                f"<li><a href='{escape(team_id)}.html'>{escape(team_id)}</a></li>" for team_id in service.team_ids()
+            )
+            body = (f"<!DOCTYPE html>\n<html>\n<head><meta charset='UTF-8'><title>Kill Teams</title></head>\n"
+                    f"<body>\n<h1>Kill Teams</h1>\n<ul>\n{links}\n</ul>\n</body></html>").encode("utf-8")
+            self.send_body(body, "text/html; charset=utf-8", {"Cache-Control": "no-cache"})
+
+        def send_body(self, body, content_type, headers):
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            print(f"🌐 {self.address_string()} {format % args}")
+
+    return RenderRequestHandler
+
+def serve(folder_path=None, options=None, host=None, port=None, max_pages=None):
+    host = host or config.SERVE_HOST
+    port = config.SERVE_PORT if port is None else port
+    get_render_plans()
+    service = RenderService(folder_path, options, max_pages)
+    server = ThreadingHTTPServer((host, port), make_request_handler(service))
+    print(f"🌐 Serving {service.folder_path} rosters on http://{host}:{server.server_port}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n👋 Stopped serving ({service.hits} page cache hits, {service.misses} renders)")
+    finally:
+        server.server_close()
+    return 0
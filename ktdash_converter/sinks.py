@@ -0,0 +1,107 @@
+"""Output sinks the renderer streams HTML parts into."""
+
+import gzip
+import os
+import sys
+from contextlib import contextmanager
+
+from . import config
+
+# === OUTPUT SINKS ===
+
+class HtmlSink:
+    """
+    Streaming destination for rendered parts. Writing parts through a sink
+    gives exactly "\\n".join(parts), without holding the document in memory.
+    """
+
+    def __init__(self, stream, separator="\n"):
+        self.stream = stream
+        self.separator = separator
+        self.started = False
+
+    def add(self, part):
+        if self.started:
+            self.stream.write(self.separator)
+        self.started = True
+        self.stream.write(part)
+
+    def extend(self, parts):
+        for part in parts:
+            self.add(part)
+
+
+class PartList(list):
+    """In-memory sink used when a renderer is asked for a string."""
+    add = list.append
+
+    def __init__(self, separator="\n"):
+        super().__init__()
+        self.separator = separator
+
+    def joined(self):
+        return self.separator.join(self)
+
+
+@contextmanager
+def open_sink(destination):
+    """
+    Sink for a file path, "-" (stdout) or an already open text stream such as
+    io.StringIO. Files are written through a OUTPUT_BUFFER_SIZE buffer into
+    <path>.tmp and renamed over the path only once rendering succeeded, so a
+    failed render never replaces the last good page.
+    """
+    if destination == "-":
+        yield HtmlSink(sys.stdout)
+        sys.stdout.flush()
+    elif isinstance(destination, (str, os.PathLike)):
+        temp_path = f"{os.fspath(destination)}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8", buffering=config.OUTPUT_BUFFER_SIZE) as f:
+                yield HtmlSink(f)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        os.replace(temp_path, destination)
+    else:
+        yield HtmlSink(destination)
+
+
+def write_gzip_companion(path, level=None):
+    """
+    Write `path`.gz for static servers that send precompressed files. A
+    companion that already decompresses to the same content is left alone
+    (a new level applies once the page changes). Returns whether it was written.
+    """
+    level = config.GZIP_LEVEL if level is None else level
+    with open(path, "rb") as f:
+        content = f.read()
+    gz_path = f"{path}.gz"
+    try:
+        with gzip.open(gz_path, "rb") as f:
+            if f.read() == content:
+                return False
+    except (OSError, EOFError):
+        pass  # Missing or unreadable: rewrite it
+
+    temp_path = f"{gz_path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(gzip.compress(content, compresslevel=level, mtime=0))
+    os.replace(temp_path, gz_path)  # A static server never sees a half-written file
+    return True
+
+def update_gzip_companion(path, level=0):
+    """
+    After `path` was (re)written: write its .gz companion with a level, or
+    else remove any left from an earlier --gzip run, which would now be stale.
+    """
+    if level:
+        return write_gzip_companion(path, level)
+    try:
+        os.remove(f"{path}.gz")
+    except FileNotFoundError:
+        pass
+    return False
@@ -0,0 +1,53 @@
+"""The page stylesheet, inline or as one shared content-hashed file."""
+
+import hashlib
+from dataclasses import replace
+from html import escape
+from pathlib import Path
+
+from . import config
+from .minify import minify_css
+from .sinks import update_gzip_companion
+
+# === STYLESHEET ===
+
+def stylesheet_text(minify=False):
+    """The stylesheet as a standalone .css file (one level of indentation removed)."""
+    lines = []
+    for line in config.STYLESHEET_LINES:
+        if line.startswith("    "):
+            line = line[4:]
+        elif line.startswith("\t"):
+            line = line[1:]
+        lines.append(line)
+    text = "\n".join(lines) + "\n"
+    return minify_css(text) if minify else text
+
+def stylesheet_filename(minify=False):
+    digest = hashlib.sha256(stylesheet_text(minify).encode("utf-8")).hexdigest()[:12]
+    return f"{config.STYLESHEET_PREFIX}.{digest}.css"
+
+def write_stylesheet(output_dir=None, minify=False, gzip_level=0):
+    """Write the content-hashed stylesheet once; an existing file with that name is already current."""
+    path = Path(output_dir or config.BASE_OUTPUT_PATH_HTML) / stylesheet_filename(minify)
+    if not path.exists():
+        path.write_text(stylesheet_text(minify), encoding="utf-8")
+        print(f"🎨 Stylesheet written to {path}")
+    update_gzip_companion(str(path), gzip_level)
+    return path.name
+
+def prepare_stylesheet(options, output_dir=None):
+    """Resolve options.css into the href every page should link (None when inline)."""
+    if options.css == "inline":
+        return replace(options, stylesheet_href=None)
+    if options.css == "external":
+        return replace(options, stylesheet_href=write_stylesheet(output_dir, options.minify, options.gzip))
+    raise ValueError(f"Unknown CSS mode: {options.css!r}")
+
+def stylesheet_head(options):
+    """<head> lines for the stylesheet: inline <style> block or a <link> to the shared file."""
+    if options.stylesheet_href:
+        return [f"  <link rel='stylesheet' href='{escape(options.stylesheet_href)}'>"]
+    if options.minify:
+        return [f"<style>{stylesheet_text(minify=True)}</style>"]
+    return ["  <style>", *config.STYLESHEET_LINES, "  </style>"]
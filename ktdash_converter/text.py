@@ -0,0 +1,138 @@
+"""Roster text: plain text/HTML classification and escaping."""
+
+import re
+import threading
+from html import escape
+
+from . import config
+from . import profiler
+from .records import CONTAINER_TYPES, MAPPING_TYPES
+
+# === UTILITY ===
+
+def title_for(key):
+    return config.TITLE_OVERRIDES.get(key.lower(), key)
+
+def should_skip_key(key):
+    return key in config.BLACKLIST_FIELDS or key in config.SKIP_RENDER_KEYS
+
+HTML_TAG_PATTERN = re.compile(r"</?[a-z][\s\S]*?>", re.IGNORECASE)
+
+class PlainText(str):
+    """Roster string classified at load time as plain text (escaped when rendered)."""
+    __slots__ = ()
+
+class HtmlText(str):
+    """Roster string classified at load time as trusted HTML (rendered as-is)."""
+    __slots__ = ()
+
+def contains_html(s):
+    profiler.PROFILER.count("contains_html_calls")
+    if isinstance(s, PlainText):
+        return False
+    if isinstance(s, HtmlText):
+        return True
+    # No "<" means no tag: skip the regex entirely
+    return "<" in s and HTML_TAG_PATTERN.search(s) is not None
+
+def classify_string(s):
+    return HtmlText(s) if contains_html(s) else PlainText(s)
+
+def classify_strings(data):
+    """
+    Classify every string value in the roster once, in place, so rendering only
+    checks the type. Equal strings share one classified object; shared dicts
+    (the flattened lists point into the nested ones) are visited once.
+    """
+    classified = {}
+    visited = set()
+    stack = [data]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in visited:
+            continue
+        visited.add(id(obj))
+        pairs = obj.items() if isinstance(obj, MAPPING_TYPES) else enumerate(obj)
+        for key, value in pairs:
+            if type(value) is str:
+                text = classified.get(value)
+                if text is None:
+                    text = classified[value] = classify_string(value)
+                    profiler.PROFILER.count("strings_classified")
+                obj[key] = text
+            elif isinstance(value, CONTAINER_TYPES):
+                stack.append(value)
+    return data
+
+# === ESCAPING ===
+
+class EscapeCache:
+    """
+    Bounded cache of escaped cell text, shared by every renderer and roster.
+    Ints skip it (digits never need escaping); text that escapes to itself is
+    stored as the same object. When full, the oldest entry is dropped.
+    """
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries  # None: config.ESCAPE_CACHE_SIZE, read when storing
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.ints = 0
+        self.lock = threading.Lock()  # Held for inserts only; lookups are single dict reads
+
+    def escape(self, value):
+        if type(value) is int:
+            self.ints += 1
+            profiler.PROFILER.count("escape_int_fast_path")
+            return str(value)
+        text = value if isinstance(value, str) else str(value)
+        escaped = self.entries.get(text)
+        if escaped is not None:
+            self.hits += 1
+            profiler.PROFILER.count("escape_cache_hits")
+            return escaped
+
+        self.misses += 1
+        profiler.PROFILER.count("escape_cache_misses")
+        escaped = escape(text)
+        if escaped == text:
+            escaped = text
+        max_entries = config.ESCAPE_CACHE_SIZE if self.max_entries is None else self.max_entries
+        if max_entries > 0:
+            with self.lock:
+                if len(self.entries) >= max_entries:
+                    del self.entries[next(iter(self.entries))]
+                self.entries[text] = escaped
+        return escaped
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "int_fast_path": self.ints, "entries": len(self.entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+ESCAPE_CACHE = EscapeCache()
+
+def escape_cell(value):
+    """HTML-escaped text of a cell value (any type), through ESCAPE_CACHE."""
+    return ESCAPE_CACHE.escape(value)
+
+# === SMALL RENDERERS ===
+
+def render_subtable(items):
+    headers = sorted({k for d in items for k in d if k not in config.BLACKLIST_FIELDS})
+    html = ["<table>"]
+    html.append("<tr>" + "".join(f"<th>{escape(h)}</th>" for h in headers) + "</tr>")
+    for d in items:
+        html.append("<tr>" + "".join(f"<td>{escape_cell(d.get(h, ''))}</td>" for h in headers) + "</tr>")
+    html.append("</table>")
+    return "".join(html)
+
+def render_keywords(keywords):
+    if not keywords:
+        return ""
+
+    tags = [kw.strip() for kw in keywords.split(",") if kw.strip()]
+    html_tags = " ".join(f"<span class='keyword-tag'>{escape_cell(tag)}</span>" for tag in tags)
+    return f"<div class='keywords-block'><strong>Keywords:</strong> {html_tags}</div>"
@@ -0,0 +1,66 @@
+"""--watch: one warm process that reconverts pages as they change."""
+
+import os
+import time
+
+from . import config
+from .batch import run_batch
+from .options import BuildOptions
+from .plans import get_render_plans
+from .stylesheet import prepare_stylesheet
+
+# === WATCH ===
+
+def snapshot_inputs(folder_path):
+    """(mtime_ns, size) of every ktdash_* page in the folder."""
+    snapshot = {}
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            if entry.name.startswith("ktdash_") and entry.is_file():
+                stat = entry.stat()
+                snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+def watch(folder_path=None, options=None, manifest_path=None, interval=None, debounce=None):
+    """
+    Keep one warm process (compiled plans, fragment cache) and reconvert only the
+    pages whose mtime or size changed. A burst of writes to the same page is
+    debounced: it is converted once it has been quiet for `debounce` seconds.
+    """
+    folder_path = folder_path or config.BASE_INPUT_PATH_HTML
+    interval = config.WATCH_INTERVAL if interval is None else interval
+    debounce = config.WATCH_DEBOUNCE if debounce is None else debounce
+    options = prepare_stylesheet(options or BuildOptions())
+    get_render_plans()
+
+    known = snapshot_inputs(folder_path)
+    run_batch(sorted(known), options=options, manifest_path=manifest_path)
+    print(f"\n👀 Watching {folder_path} for ktdash_* changes (Ctrl+C to stop)")
+
+    pending = {}  # path -> monotonic time of its last observed change
+    try:
+        while True:
+            time.sleep(min(interval, debounce) if pending else interval)
+            current = snapshot_inputs(folder_path)
+            now = time.monotonic()
+
+            for file_path, signature in current.items():
+                if known.get(file_path) != signature:
+                    known[file_path] = signature
+                    pending[file_path] = now
+            for file_path in set(known) - set(current):
+                del known[file_path]
+                pending.pop(file_path, None)
+                print(f"🗑️ {file_path} removed")
+
+            ready = sorted(path for path, changed in pending.items() if now - changed >= debounce)
+            if not ready:
+                continue
+            for file_path in ready:
+                del pending[file_path]
+            start = time.perf_counter()
+            run_batch(ready, options=options, manifest_path=manifest_path)
+            print(f"🔁 Handled {len(ready)} changed page(s) in {(time.perf_counter() - start) * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    return 0
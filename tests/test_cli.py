@@ -0,0 +1,41 @@
+"""Command line: --config/--set overrides reach every default, including those of modules imported early."""
+
+import os
+import subprocess
+import sys
+
+REPO = os.path.join(os.path.dirname(__file__), os.pardir)
+
+
+def run_cli(*argv):
+    return subprocess.run([sys.executable, "-m", "ktdash_converter", *argv], cwd=REPO,
+                          capture_output=True, text=True, encoding="utf-8", check=True).stdout
+
+
+def test_set_overrides_reach_module_defaults(tmp_path):
+    manifest = tmp_path / "other.json"
+    pages = ["html/ktdash_gk.html", "html/ktdash_dw.html"]
+    output = run_cli(*pages, "-o", str(tmp_path), "--set", "FRAGMENT_CACHE_SIZE=0", "--set", f"BUILD_MANIFEST={manifest}")
+    assert manifest.is_file()
+    assert "Fragment cache" not in output  # Disabled: never consulted
+    assert (tmp_path / "GK24.html").is_file()
+
+    output = run_cli(*pages, "-o", str(tmp_path), "--set", f"BUILD_MANIFEST={manifest}")
+    assert output.count("(unchanged)") == 2
+
+
+def test_archive_inputs_stay_in_the_chosen_mode(tmp_path):
+    import zipfile
+    export = tmp_path / "export.zip"
+    with zipfile.ZipFile(export, "w") as zf:
+        zf.write(os.path.join(REPO, "html", "ktdash_gk.html"), "ktdash_gk.html")
+
+    index = tmp_path / "z.db"
+    result = subprocess.run([sys.executable, "-m", "ktdash_converter", str(export), "--ingest", "--index-db", str(index),
+                             "-o", str(tmp_path)], cwd=REPO, capture_output=True, text=True, encoding="utf-8")
+    assert result.returncode == 2
+    assert not index.exists() and not (tmp_path / "GK24.html").exists()
+
+    output = run_cli(str(export), "--stdout", "-o", str(tmp_path))
+    assert output.startswith("<!DOCTYPE html>") and "Grey Knights" in output
+    assert not (tmp_path / "GK24.html").exists()
@@ -0,0 +1,18 @@
+from ktdash_converter.compare import ProfileStore
+
+
+def roster(*profiles):
+    return {"killteamid": "XX24", "killteamname": "Test Team",
+            "operatives_weapons": [{"wepname": "Gun", "weptype": "R", "profiles": list(profiles)}]}
+
+
+def test_out_of_range_profiles_are_skipped():
+    store = ProfileStore()
+    store.add_roster(roster(
+        {"A": "300", "BS": "3+", "D": "1000/2000", "SR": ""},
+        {"A": "99999999999", "BS": "3+", "D": "3/4", "SR": ""},
+        {"A": "-", "BS": "-", "D": "-", "SR": ""},
+    ))
+    assert len(store) == 1
+    assert store.skipped == 2
+    assert (store.attacks[0], store.normal[0], store.critical[0]) == (300, 1000, 2000)
@@ -0,0 +1,28 @@
+"""Lint for ktdash_converter/config.py: a dict literal silently keeps the last of duplicate keys."""
+
+import ast
+
+from ktdash_converter import config
+
+
+def duplicate_dict_keys(source):
+    duplicates = []
+    for node in ast.walk(ast.parse(source)):
+        if not isinstance(node, ast.Dict):
+            continue
+        seen = set()
+        for key in node.keys:
+            if isinstance(key, ast.Constant):
+                if key.value in seen:
+                    duplicates.append(f"{key.value!r} (line {key.lineno})")
+                seen.add(key.value)
+    return duplicates
+
+
+def test_config_has_no_duplicate_dict_keys():
+    with open(config.__file__, encoding="utf-8") as f:
+        assert duplicate_dict_keys(f.read()) == []
+
+
+def test_duplicate_dict_keys_are_found():
+    assert duplicate_dict_keys("COLUMN_CONFIG = {'weapons': [], 'ploys': [], 'weapons': []}") == ["'weapons' (line 1)"]
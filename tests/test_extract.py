@@ -0,0 +1,64 @@
+"""Loading pages: attribute extraction from files and streams, and the compact loader."""
+
+import io
+import os
+import tracemalloc
+
+import pytest
+
+from ktdash_converter.batch import write_to_stdout
+from ktdash_converter.extract import (CompactLoader, ConversionError, clean_and_flatten, decode_killteam_attribute,
+                                      find_killteam_attribute, read_killteam_attribute_stream)
+
+FIXTURES = os.path.join(os.path.dirname(__file__), os.pardir, "html")
+
+
+def test_compact_loader_scopes_interned_strings():
+    page = os.path.join(FIXTURES, "ktdash_gk.html")
+    first = clean_and_flatten(page, compact=True)
+    second = clean_and_flatten(page, compact=True)
+    assert first["killteamname"] == second["killteamname"]
+    assert first["killteamname"] is not second["killteamname"]  # Separate sessions keep nothing alive
+
+    loader = CompactLoader()
+    shared = [clean_and_flatten(page, compact=loader) for _ in range(2)]
+    assert shared[0]["killteamname"] is shared[1]["killteamname"]
+    assert shared[0]["killteamname"] in loader.strings
+
+
+@pytest.mark.parametrize("page", [
+    b"<html><body class='x' killteam=\"" + b"a" * 50 + b"\"></body></html>",
+    b"<div killteam=\"\"></div><div killteam=\"abc\"></div>",  # No <body: searched from the top
+    b"<html><head></head></html>",
+    b"<body killteam=\"unterminated",
+])
+def test_stream_extractor_matches_mapped_extractor(page):
+    for chunk_size in (1, 3, 7, 1024):
+        assert read_killteam_attribute_stream(io.BytesIO(page), chunk_size) == find_killteam_attribute(page)
+
+
+@pytest.mark.parametrize("raw", [b"[1,2]", b"&quot;GK24&quot;", b"42", b"null"])
+def test_attribute_must_hold_a_json_object(raw):
+    for compact in (False, True):
+        with pytest.raises(ConversionError, match="not a JSON object"):
+            decode_killteam_attribute(raw, compact=compact)
+
+
+def test_non_object_roster_does_not_abort_the_run(tmp_path, capsys):
+    bad = tmp_path / "ktdash_bad.html"
+    bad.write_bytes(b"<html><body killteam=\"[1,2]\"></body></html>")
+    assert write_to_stdout([str(bad), os.path.join(FIXTURES, "ktdash_gk.html")]) == 1
+    captured = capsys.readouterr()
+    assert "Grey Knights" in captured.out
+    assert "not a JSON object" in captured.err
+
+
+def test_stream_extractor_does_not_buffer_the_page():
+    for page in (b"<html><head>" + b"x" * 2_000_000 + b"</head><body killteam=\"abc\"></body></html>",
+                 b"<html>" + b"x" * 2_000_000 + b"<div killteam=\"abc\"></div></html>"):
+        stream = io.BytesIO(page)
+        tracemalloc.start()
+        assert read_killteam_attribute_stream(stream, 4096) == b"abc"
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert peak < 100_000
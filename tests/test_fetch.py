@@ -0,0 +1,88 @@
+"""--fetch against a local stand-in for ktdash.app: retries, conditional requests and bad pages."""
+
+import hashlib
+import os
+import shutil
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ktdash_converter import config
+from ktdash_converter.fetch import fetch_pages, retry_delay
+
+FIXTURES = os.path.join(os.path.dirname(__file__), os.pardir, "html")
+PAGES = {"GK24": "ktdash_gk.html", "DW24": "ktdash_dw.html"}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    unavailable = {}  # killteamid -> 503 responses still to send
+    requests = []
+
+    def do_GET(self):
+        killteam_id = self.path.rstrip("/").rpartition("/")[2]
+        self.requests.append((killteam_id, self.headers.get("If-None-Match")))
+        if self.unavailable.get(killteam_id):
+            self.unavailable[killteam_id] -= 1
+            self.reply(503, headers={"Retry-After": "0"})
+        elif killteam_id == "BAD":
+            self.reply(200, b"<html><body>Not a roster</body></html>")
+        elif killteam_id not in PAGES:
+            self.reply(404)
+        else:
+            with open(os.path.join(FIXTURES, PAGES[killteam_id]), "rb") as f:
+                body = f.read()
+            etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.reply(304, headers={"ETag": etag})
+            else:
+                self.reply(200, body, {"ETag": etag})
+
+    def reply(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def standin(tmp_path, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(config, "FETCH_BASE_URL", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(config, "FETCH_BACKOFF", 0)
+    StandInHandler.unavailable = {"DW24": 1}
+    StandInHandler.requests = []
+    yield tmp_path
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_retries_revalidates_and_rejects_bad_pages(standin):
+    shutil.copy(os.path.join(FIXTURES, "ktdash_gk.html"), standin / "ktdash_gk.html")
+    manifest = str(standin / "fetch.json")
+
+    first = fetch_pages(["GK24", "DW24", "BAD"], str(standin), manifest)
+    assert [r["error"] for r in first[:2]] == [None, None]
+    assert "no killteam attribute" in first[2]["error"]
+    assert [killteam_id for killteam_id, _ in StandInHandler.requests].count("DW24") == 2  # 503, then 200
+    # GK24 replaces the page already holding that roster instead of adding ktdash_gk24.html next to it
+    assert first[0]["output"] == str(standin / "ktdash_gk.html")
+    assert sorted(os.listdir(standin)) == ["fetch.json", "ktdash_dw24.html", "ktdash_gk.html"]
+
+    second = fetch_pages(["GK24", "DW24"], str(standin), manifest)
+    assert [r["cached"] for r in second] == [True, True]
+    assert all(etag for _, etag in StandInHandler.requests[-2:])
+
+
+def test_retry_after_is_capped(monkeypatch):
+    monkeypatch.setattr(config, "FETCH_MAX_RETRY_AFTER", 5)
+    assert retry_delay(0, {"Retry-After": "86400"}) == 5
+    assert retry_delay(0, {"Retry-After": "2"}) == 2
@@ -0,0 +1,33 @@
+"""--ingest: incremental indexing, per-file failures and rule queries."""
+
+import os
+from contextlib import closing
+
+from ktdash_converter.index import find_weapons_with_rule, ingest, open_index, weapon_rules
+
+FIXTURE = os.path.join(os.path.dirname(__file__), os.pardir, "html", "ktdash_gk.html")
+
+
+def test_missing_input_is_counted_as_failed(tmp_path, capsys):
+    index_path = str(tmp_path / "index.sqlite3")
+    assert ingest([FIXTURE, str(tmp_path / "missing.html")], index_path) == 1
+    assert "1 indexed, 0 unchanged, 1 failed" in capsys.readouterr().out
+
+
+def test_unchanged_input_is_skipped(tmp_path, capsys):
+    index_path = str(tmp_path / "index.sqlite3")
+    assert ingest([FIXTURE], index_path) == 0
+    assert ingest([FIXTURE], index_path) == 0
+    assert "0 indexed, 1 unchanged, 0 failed" in capsys.readouterr().out
+    with closing(open_index(index_path)) as connection:
+        assert all(row["killteamid"] == "GK24" for row in find_weapons_with_rule(connection, "Lethal"))
+
+
+def test_weapon_rule_names_drop_parameters_and_qualifiers():
+    assert weapon_rules('Lethal 5+, Rng 6", Dev1, PrcCrit1, Hvy (DashOnly), Hvy (RepOnly), Hvy, Sat Tor 2", -') == [
+        ("Lethal 5+", "Lethal"), ('Rng 6"', "Rng"), ("Dev1", "Dev"), ("PrcCrit1", "PrcCrit"),
+        ("Hvy (DashOnly)", "Hvy"), ("Hvy (RepOnly)", "Hvy"), ("Hvy", "Hvy"), ('Sat Tor 2"', "Sat Tor"),
+    ]
+    assert [name for _, name in weapon_rules('Lethal x+, Blast x", Smart Targeting, Piercing 1 (Ranged)')] == [
+        "Lethal", "Blast", "Smart Targeting", "Piercing",
+    ]
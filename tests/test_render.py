@@ -0,0 +1,31 @@
+"""Rendering: config overrides reach fragments the cache rendered before them."""
+
+import io
+import os
+
+from ktdash_converter import config
+from ktdash_converter.extract import clean_and_flatten
+from ktdash_converter.options import apply_overrides
+from ktdash_converter.render import render_document
+from ktdash_converter.sinks import open_sink
+
+FIXTURE = os.path.join(os.path.dirname(__file__), os.pardir, "html", "ktdash_gk.html")
+
+
+def render(data):
+    with io.StringIO() as buffer:
+        with open_sink(buffer) as sink:
+            render_document(data, sink)
+        return buffer.getvalue()
+
+
+def test_overrides_invalidate_cached_fragments():
+    data = clean_and_flatten(FIXTURE)
+    original = dict(config.TITLE_OVERRIDES)
+    assert "Renamed Ploys" not in render(data)
+    try:
+        apply_overrides([("TITLE_OVERRIDES", {**original, "strat": "Renamed Ploys"})])
+        assert "Renamed Ploys" in render(data)
+    finally:
+        apply_overrides([("TITLE_OVERRIDES", original)])
+    assert "Renamed Ploys" not in render(data)
@@ -0,0 +1,48 @@
+"""--serve: conditional GET is answered from the input hashes, without rendering."""
+
+import os
+import shutil
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from ktdash_converter.server import RenderService, make_request_handler
+
+FIXTURES = os.path.join(os.path.dirname(__file__), os.pardir, "html")
+
+
+@pytest.fixture
+def service(tmp_path):
+    for name in ("ktdash_gk.html", "ktdash_dw.html"):
+        shutil.copy(os.path.join(FIXTURES, name), tmp_path / name)
+    service = RenderService(str(tmp_path), max_pages=1)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_request_handler(service))
+    server.RequestHandlerClass.log_message = lambda *args: None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    service.base_url = f"http://127.0.0.1:{server.server_port}/"
+    yield service
+    server.shutdown()
+    server.server_close()
+
+
+def test_not_modified_after_eviction_does_not_render(service):
+    with urllib.request.urlopen(service.base_url + "GK24.html") as response:
+        etag = response.headers["ETag"]
+        assert b"Grey Knights" in response.read()
+    urllib.request.urlopen(service.base_url + "DW24.html").read()  # Evicts GK24 (max_pages=1)
+    renders = service.misses
+
+    request = urllib.request.Request(service.base_url + "GK24.html", headers={"If-None-Match": etag})
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(request)
+    assert error.value.code == 304
+    assert service.misses == renders
+
+
+def test_unknown_team_is_404(service):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(service.base_url + "NOPE.html")
+    assert error.value.code == 404
@@ -0,0 +1,25 @@
+"""--gzip companions follow the page they belong to."""
+
+import gzip
+import os
+import subprocess
+import sys
+
+REPO = os.path.join(os.path.dirname(__file__), os.pardir)
+
+
+def run_cli(*argv):
+    subprocess.run([sys.executable, "-m", "ktdash_converter", "html/ktdash_gk.html", *argv],
+                   cwd=REPO, capture_output=True, check=True)
+
+
+def test_rebuild_without_gzip_removes_stale_companions(tmp_path):
+    page, manifest = tmp_path / "GK24.html", tmp_path / "manifest.json"
+    common = ["-o", str(tmp_path), "--manifest", str(manifest), "--css", "external"]
+    run_cli(*common, "--gzip")
+    assert gzip.decompress((tmp_path / "GK24.html.gz").read_bytes()) == page.read_bytes()
+    assert list(tmp_path.glob("*.css.gz"))
+
+    run_cli(*common, "--set", 'TITLE_OVERRIDES={"strat": "Renamed Ploys"}')
+    assert "Renamed Ploys" in page.read_text(encoding="utf-8")
+    assert not list(tmp_path.glob("*.gz"))